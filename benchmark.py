@@ -0,0 +1,342 @@
+# Description: Benchmark harness for the graph classes. Builds seeded synthetic graphs (Erdos-Renyi, 2D grid,
+# Barabasi-Albert, long chain, dense clique), times the public methods across a sweep of sizes, records peak
+# memory with tracemalloc, and writes the results to JSON. A compare mode checks a run against a stored baseline
+# and fails when any method got slower than a threshold allows.
+#
+#   python benchmark.py run --sizes 100 1000 --out results.json
+#   python benchmark.py compare baseline.json results.json --threshold 0.25
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from d_graph import DirectedGraph, SparseDirectedGraph
+from ud_graph import UndirectedGraph, CompactUndirectedGraph
+
+# ---------------------------------------------------------------------- #
+# Seeded graph generators. Each returns a list of (u, v) pairs over the
+# vertices 0 .. n - 1, with u != v and no repeated pair.
+
+
+def erdos_renyi(n: int, seed: int, average_degree=8) -> []:
+    """
+    Returns about n * average_degree / 2 edges between uniformly random
+    vertex pairs (G(n, m) model).
+    """
+    rng = random.Random(seed)
+    target = min(n * average_degree // 2, n * (n - 1) // 2)
+    edges = set()
+    while len(edges) < target:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v and (v, u) not in edges:
+            edges.add((u, v))
+    return sorted(edges)
+
+
+def grid_2d(n: int, seed: int) -> []:
+    """
+    Returns the edges of a square grid with about n vertices, each joined to
+    its right and lower neighbour. The seed is unused; the grid is fixed.
+    """
+    side = max(1, int(n ** 0.5))
+    edges = []
+    for row in range(side):
+        for col in range(side):
+            vertex = row * side + col
+            if col + 1 < side:
+                edges.append((vertex, vertex + 1))
+            if row + 1 < side:
+                edges.append((vertex, vertex + side))
+    return edges
+
+
+def barabasi_albert(n: int, seed: int, m=3) -> []:
+    """
+    Returns a power-law graph: each new vertex attaches to m existing
+    vertices chosen with probability proportional to their degree.
+    """
+    rng = random.Random(seed)
+    edges = []
+    # Every edge endpoint appears once in "targets", so a uniform pick from
+    # it is a degree-proportional pick of a vertex.
+    targets = list(range(min(m, n)))
+    for vertex in range(m, n):
+        chosen = set()
+        while len(chosen) < m:
+            chosen.add(rng.choice(targets))
+        for other in chosen:
+            edges.append((other, vertex))
+            targets.extend((other, vertex))
+    return edges
+
+
+def chain(n: int, seed: int) -> []:
+    """
+    Returns the edges of a path 0 - 1 - ... - n - 1, the worst case for
+    recursion depth and search frontier length. The seed is unused.
+    """
+    return [(vertex, vertex + 1) for vertex in range(n - 1)]
+
+
+def clique(n: int, seed: int) -> []:
+    """
+    Returns every edge of the complete graph on n vertices, in ascending
+    order. The seed is unused.
+    """
+    return [(u, v) for u in range(n) for v in range(u + 1, n)]
+
+
+GENERATORS = {
+    'erdos_renyi': erdos_renyi,
+    'grid_2d': grid_2d,
+    'barabasi_albert': barabasi_albert,
+    'chain': chain,
+    'clique': clique,
+}
+
+# Cliques have n^2 / 2 edges, so their sizes are scaled down.
+CLIQUE_SCALE = 0.1
+
+
+def directed_edges(pairs: [], seed: int) -> []:
+    """
+    Turns (u, v) pairs into (src, dst, weight) edges with seeded random
+    weights from 1 to 20, for the directed graph classes.
+    """
+    rng = random.Random(seed)
+    return [(u, v, rng.randint(1, 20)) for u, v in pairs]
+
+
+def undirected_edges(pairs: []) -> []:
+    """
+    Turns (u, v) pairs into pairs of string names, for the undirected graph
+    classes.
+    """
+    return [(str(u), str(v)) for u, v in pairs]
+
+
+# ---------------------------------------------------------------------- #
+# Benchmarked methods. Each entry maps a method name to a function that
+# takes (graph class, edges, built graph) and runs the method once.
+
+
+def _build_one_by_one(cls, edges, directed):
+    """
+    Builds a graph of "cls" by calling add_vertex() and add_edge() per item.
+    """
+    graph = cls()
+    if directed:
+        v_count = 1 + max((max(u, v) for u, v, _ in edges), default=-1)
+        for _ in range(v_count):
+            graph.add_vertex()
+        for u, v, weight in edges:
+            graph.add_edge(u, v, weight)
+    else:
+        for u, v in edges:
+            graph.add_edge(u, v)
+    return graph
+
+
+DIRECTED_METHODS = {
+    'add_edge': lambda cls, edges, graph: _build_one_by_one(cls, edges, True),
+    'add_edges_from': lambda cls, edges, graph: cls.from_edge_list(edges),
+    'get_edges': lambda cls, edges, graph: graph.get_edges(),
+    'dfs': lambda cls, edges, graph: graph.dfs(0),
+    'bfs': lambda cls, edges, graph: graph.bfs(0),
+    'has_cycle': lambda cls, edges, graph: graph.has_cycle(),
+    'dijkstra': lambda cls, edges, graph: graph.dijkstra(0),
+    # The engine is kept on the graph, so after the first repeat this times
+    # the bucket search alone; build cost shows in peak_bytes and the first
+    # run.
+    'delta_stepping': lambda cls, edges, graph: graph.delta_stepping(0),
+    'shortest_path': lambda cls, edges, graph: graph.shortest_path(0, graph.v_count - 1),
+}
+
+UNDIRECTED_METHODS = {
+    'add_edge': lambda cls, edges, graph: _build_one_by_one(cls, edges, False),
+    'add_edges_from': lambda cls, edges, graph: cls.from_edge_list(edges),
+    'get_edges': lambda cls, edges, graph: graph.get_edges(),
+    'dfs': lambda cls, edges, graph: graph.dfs('0'),
+    'bfs': lambda cls, edges, graph: graph.bfs('0'),
+    'has_cycle': lambda cls, edges, graph: graph.has_cycle(),
+    # Components are cached on the graph, so this entry times a fresh build
+    # plus the first count, which is when the work is done.
+    'build+count_connected_components':
+        lambda cls, edges, graph: cls.from_edge_list(edges).count_connected_components(),
+    'multi_source_bfs': lambda cls, edges, graph: graph.multi_source_bfs(str(v) for v in range(64)),
+    'triangle_count': lambda cls, edges, graph: graph.triangle_count(),
+}
+
+CLASSES = {
+    'DirectedGraph': (DirectedGraph, True),
+    'SparseDirectedGraph': (SparseDirectedGraph, True),
+    'UndirectedGraph': (UndirectedGraph, False),
+    'CompactUndirectedGraph': (CompactUndirectedGraph, False),
+}
+
+# The dense matrix is O(V^2); larger sizes are skipped for it.
+DENSE_MAX_VERTICES = 2000
+
+
+def _time(function, repeat: int) -> float:
+    """
+    Returns the fastest of "repeat" timed calls of function(), in seconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_bytes(function) -> int:
+    """
+    Returns the peak memory allocated while running function() once, in
+    bytes, as traced by tracemalloc.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes, generators=None, classes=None, methods=None, repeat=3, seed=0, measure_memory=True,
+        log=None) -> dict:
+    """
+    Runs the benchmark sweep and returns the results as a dictionary:
+    "meta" describes the run, and "results" maps keys of the form
+    "class/generator/size/method" to {"seconds", "peak_bytes", "vertices",
+    "edges"}. Generators, classes and methods default to all of them.
+    If given, log is called with a line of text after every measurement.
+    """
+    generators = generators or list(GENERATORS)
+    classes = classes or list(CLASSES)
+    results = dict()
+
+    for generator_name in generators:
+        for size in sizes:
+            n = max(2, int(size * CLIQUE_SCALE)) if generator_name == 'clique' else size
+            pairs = GENERATORS[generator_name](n, seed)
+            vertices = 1 + max((max(pair) for pair in pairs), default=0)
+
+            for class_name in classes:
+                cls, directed = CLASSES[class_name]
+                if cls is DirectedGraph and vertices > DENSE_MAX_VERTICES:
+                    continue
+                edges = directed_edges(pairs, seed) if directed else undirected_edges(pairs)
+                graph = cls.from_edge_list(edges)
+                table = DIRECTED_METHODS if directed else UNDIRECTED_METHODS
+
+                for method_name, method in table.items():
+                    if methods and method_name not in methods:
+                        continue
+
+                    def call():
+                        method(cls, edges, graph)
+
+                    record = {
+                        'seconds': _time(call, repeat),
+                        'peak_bytes': _peak_bytes(call) if measure_memory else None,
+                        'vertices': vertices,
+                        'edges': len(edges),
+                    }
+                    key = f'{class_name}/{generator_name}/{size}/{method_name}'
+                    results[key] = record
+                    if log is not None:
+                        log(f"{key:<60} {record['seconds'] * 1000:10.3f} ms")
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': list(sizes),
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold=0.25, min_seconds=1e-4) -> []:
+    """
+    Compares two results dictionaries from run() and returns a list of
+    (key, baseline seconds, current seconds, ratio) tuples for every
+    benchmark present in both that got slower by more than "threshold"
+    (0.25 = 25%). Baseline timings under "min_seconds" are too noisy to
+    compare and are ignored.
+    """
+    regressions = []
+    for key, base in baseline['results'].items():
+        new = current['results'].get(key)
+        if new is None or base['seconds'] < min_seconds:
+            continue
+        ratio = new['seconds'] / base['seconds']
+        if ratio > 1 + threshold:
+            regressions.append((key, base['seconds'], new['seconds'], ratio))
+    return regressions
+
+
+def main(argv=None) -> int:
+    """
+    Command line entry point. Returns the process exit status: 1 if compare
+    found a regression, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the graph classes.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmark sweep')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000])
+    run_parser.add_argument('--generators', nargs='+', choices=list(GENERATORS))
+    run_parser.add_argument('--classes', nargs='+', choices=list(CLASSES))
+    run_parser.add_argument('--methods', nargs='+')
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--no-memory', action='store_true', help='skip peak memory measurement')
+    run_parser.add_argument('--out', help='write results to this JSON file')
+    run_parser.add_argument('--baseline', help='compare against this JSON file after running')
+    run_parser.add_argument('--threshold', type=float, default=0.25)
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.25)
+    compare_parser.add_argument('--min-seconds', type=float, default=1e-4)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        current = run(args.sizes, args.generators, args.classes, args.methods, args.repeat, args.seed,
+                      not args.no_memory, log=print)
+        if args.out:
+            with open(args.out, 'w') as file:
+                json.dump(current, file, indent=2, sort_keys=True)
+        if not args.baseline:
+            return 0
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        min_seconds = 1e-4
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+        min_seconds = args.min_seconds
+
+    regressions = compare(baseline, current, args.threshold, min_seconds)
+    for key, before, after, ratio in regressions:
+        print(f"REGRESSION {key}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)")
+    if regressions:
+        return 1
+    print("no regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
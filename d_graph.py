@@ -4,9 +4,1065 @@
 # Description: Implementation of directed graph class, including Dijkstra's algorithm. Utilizes skeleton code
 # provided by the course as well as pseudocode from the course. Utilizes the wikipedia article on topological
 # sorting "https://en.wikipedia.org/wiki/Topological_sorting" to implement cycle detection.
+# SparseDirectedGraph stores the same graph as per-vertex out-edge dictionaries for large, sparse inputs.
 
 import heapq
-from collections import deque
+import os
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+
+import graph_io
+import instrumentation
+
+class ShortestPathCache:
+    """
+    Least recently used cache of dijkstra() results for one graph
+    - keys are (source vertex, graph version) pairs
+    - results from an older graph version are never returned
+    - bounded by a number of entries and, optionally, by an approximate
+      size in bytes
+    - safe to use from several threads at once
+    """
+
+    def __init__(self, max_entries=128, max_bytes=None):
+        """
+        Creates an empty cache holding at most "max_entries" results and, if
+        "max_bytes" is given, at most that many bytes of result lists.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = dict()
+        self.version = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def _size_of(entry) -> int:
+        """
+        Returns the approximate size in bytes of a cached (distances,
+        predecessors) tuple: the two lists plus every distinct object they
+        hold. Each computed distance is a separate int or float object, so
+        the items usually outweigh the lists themselves; objects shared
+        between slots (INFINITY, None, the same vertex number) are counted
+        once.
+        """
+        size = 0
+        seen = set()
+        for values in entry:
+            size += sys.getsizeof(values)
+            for value in values:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+        return size
+
+    def get(self, src: int, version: int):
+        """
+        Returns the cached result for "src" at graph version "version", or
+        None if there is none. Records a hit or a miss.
+        """
+        with self.lock:
+            # The graph changed since the cache was filled. Every entry is
+            # stale, so drops them all at once instead of letting them age
+            # out.
+            if version != self.version:
+                self.clear()
+                self.version = version
+
+            entry = self.entries.get((src, version))
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end((src, version))
+            self.hits += 1
+            return entry
+
+    def put(self, src: int, version: int, entry) -> None:
+        """
+        Stores the result "entry" for "src" at graph version "version",
+        evicting least recently used results to stay within the limits.
+        """
+        size = self._size_of(entry)
+        # A single result larger than the whole budget is not cached.
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self.lock:
+            if version != self.version:
+                self.clear()
+                self.version = version
+
+            # Sizes are kept per key so eviction does not walk the lists
+            # again.
+            key = (src, version)
+            if key in self.entries:
+                del self.entries[key]
+                self.bytes -= self.sizes.pop(key)
+            self.entries[key] = entry
+            self.sizes[key] = size
+            self.bytes += size
+
+            while len(self.entries) > self.max_entries or \
+                    (self.max_bytes is not None and self.bytes > self.max_bytes):
+                evicted, _ = self.entries.popitem(last=False)
+                self.bytes -= self.sizes.pop(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Removes every cached result. Statistics are kept.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns a dictionary with the number of hits, misses and evictions,
+        the hit rate, and the current number of entries and bytes.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+            }
+
+
+class CycleError(ValueError):
+    """
+    Raised when an edge would create a cycle in a graph whose incremental
+    cycle check rejects cycles. The "cycle" attribute holds the cycle the
+    edge would have closed, with its first vertex repeated at the end.
+    """
+
+    def __init__(self, cycle):
+        super().__init__(f"edge would create cycle {cycle}")
+        self.cycle = cycle
+
+
+class _IncrementalCycleCheck:
+    """
+    Dynamic topological order of a DirectedGraph, kept up to date as edges
+    are added, after Pearce and Kelly, "A Dynamic Topological Sort Algorithm
+    for Directed Acyclic Graphs".
+    - order[i] is the vertex at position i and position[v] is its inverse
+    - cycle is None while the graph is acyclic, otherwise a cycle witness
+    """
+
+    def __init__(self, graph, reject_cycles):
+        """
+        Builds the initial order of "graph" with topological_sort().
+        """
+        self.graph = graph
+        self.reject_cycles = reject_cycles
+        self.order = []
+        self.position = []
+        self.cycle = None
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        Recomputes the order from scratch in O(V + E).
+        """
+        # Computes the order with the graph's own Kahn's algorithm, bypassing
+        # this check in case it is already attached to the graph.
+        check, self.graph._cycle_check = self.graph._cycle_check, None
+        order, cycle = self.graph.topological_sort()
+        self.graph._cycle_check = check
+
+        self.cycle = cycle
+        if order is None:
+            order = list(range(self.graph.v_count))
+        self.order = order
+        self.position = [0] * len(order)
+        for index, vertex in enumerate(order):
+            self.position[vertex] = index
+
+    def result(self) -> tuple:
+        """
+        Returns the (order, cycle) tuple described in topological_sort().
+        """
+        if self.cycle is not None:
+            return None, list(self.cycle)
+        return list(self.order), None
+
+    def add_vertices(self) -> None:
+        """
+        Places the vertices added to the graph since the last call last in
+        the order.
+        """
+        for vertex in range(len(self.order), self.graph.v_count):
+            self.position.append(len(self.order))
+            self.order.append(vertex)
+
+    def remove_edge(self) -> None:
+        """
+        Called after an edge was removed. Removing an edge never invalidates a
+        topological order, but it may break the known cycle, in which case the
+        order is recomputed.
+        """
+        if self.cycle is not None:
+            self.rebuild()
+
+    def add_edge(self, src: int, dst: int) -> None:
+        """
+        Called before the new edge from "src" to "dst" is stored. Reorders
+        the vertices whose positions lie between dst and src so that the edge
+        points forward, or detects the cycle it closes.
+        """
+        # Nothing to maintain once the graph is known to be cyclic, and an
+        # edge that already points forward keeps the order valid.
+        if self.cycle is not None:
+            return
+        position = self.position
+        lower, upper = position[dst], position[src]
+        if lower > upper:
+            return
+
+        # Forward search from dst through vertices placed no later than src.
+        # Reaching src means the new edge closes a cycle.
+        parent = {dst: None}
+        forward = [dst]
+        to_visit = [dst]
+        while to_visit:
+            vertex = to_visit.pop()
+            for nxt, _ in self.graph._out_edges(vertex):
+                if nxt == src:
+                    # Cycle src -> dst -> ... -> vertex -> src.
+                    cycle = [src]
+                    while vertex is not None:
+                        cycle.append(vertex)
+                        vertex = parent[vertex]
+                    cycle = [src] + cycle[:0:-1] + [src]
+                    if self.reject_cycles:
+                        raise CycleError(cycle)
+                    self.cycle = cycle
+                    return
+                if nxt not in parent and position[nxt] < upper:
+                    parent[nxt] = vertex
+                    forward.append(nxt)
+                    to_visit.append(nxt)
+
+        # Backward search from src through vertices placed after dst.
+        backward = [src]
+        seen = {src}
+        to_visit = [src]
+        while to_visit:
+            vertex = to_visit.pop()
+            for prev, _ in self.graph._in_edges(vertex):
+                if prev not in seen and position[prev] > lower:
+                    seen.add(prev)
+                    backward.append(prev)
+                    to_visit.append(prev)
+
+        # Everything that reaches src must now come before everything dst
+        # reaches. Reuses the positions the affected vertices held, giving
+        # them to the backward set first, each set keeping its relative order.
+        backward.sort(key=position.__getitem__)
+        forward.sort(key=position.__getitem__)
+        affected = backward + forward
+        slots = sorted(position[vertex] for vertex in affected)
+        for vertex, slot in zip(affected, slots):
+            position[vertex] = slot
+            self.order[slot] = vertex
+
+
+class ShortestPathTree:
+    """
+    Shortest path tree from one source vertex of a DirectedGraph, kept up to
+    date as edges change (in the style of Ramalingam and Reps)
+    - created by DirectedGraph.track_shortest_paths(); the graph notifies it
+      of every edge insertion, removal and weight change
+    - a cheaper path only re-runs Dijkstra from the improved vertex, over
+      the vertices whose distance actually drops
+    - a tree edge that gets more expensive or is removed only recomputes the
+      subtree hanging below it; edges outside the tree need no work
+    """
+
+    def __init__(self, graph, source: int):
+        """
+        Builds the tree for "source" with a full dijkstra() search.
+        """
+        self.graph = graph
+        self.source = source
+        self.affected = 0
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        Recomputes the whole tree from scratch.
+        """
+        self.distances, self.parents = self.graph._dijkstra_search(self.source, None)
+        self.children = [set() for _ in range(len(self.parents))]
+        for vertex, parent in enumerate(self.parents):
+            if parent is not None:
+                self.children[parent].add(vertex)
+        self.affected = len(self.distances)
+
+    def distance(self, vertex: int):
+        """
+        Returns the length of the shortest path from the source to "vertex",
+        or INFINITY if it is not reachable.
+        """
+        return self.distances[vertex]
+
+    def path(self, vertex: int) -> []:
+        """
+        Returns the list of vertices on a shortest path from the source to
+        "vertex", or an empty list if it is not reachable.
+        """
+        return DirectedGraph.reconstruct_path(self.parents, self.source, vertex)
+
+    def add_vertices(self) -> None:
+        """
+        Extends the tree with new, unreachable vertices.
+        """
+        missing = self.graph.v_count - len(self.distances)
+        self.distances.extend([float('inf')] * missing)
+        self.parents.extend([None] * missing)
+        self.children.extend(set() for _ in range(missing))
+
+    def update_edge(self, src: int, dst: int, old_weight, new_weight) -> None:
+        """
+        Repairs the tree after the weight of the edge from "src" to "dst"
+        changed from "old_weight" to "new_weight", where 0 means no edge.
+        The graph already holds the new weight. affected is set to the
+        number of vertices whose distance was recomputed.
+        """
+        self.affected = 0
+        if new_weight and (not old_weight or new_weight < old_weight):
+            self._decrease(src, dst, new_weight)
+        elif self.parents[dst] == src:
+            self._increase(dst)
+
+    def _set_parent(self, vertex: int, parent) -> None:
+        """
+        Moves "vertex" under "parent" in the tree.
+        """
+        old = self.parents[vertex]
+        if old is not None:
+            self.children[old].discard(vertex)
+        self.parents[vertex] = parent
+        if parent is not None:
+            self.children[parent].add(vertex)
+
+    def _decrease(self, src: int, dst: int, weight) -> None:
+        """
+        Handles a new or cheaper edge: if it shortens the path to "dst",
+        spreads the improvement with a Dijkstra search that only enters
+        vertices whose distance drops.
+        """
+        distances = self.distances
+        new_distance = distances[src] + weight
+        if not new_distance < distances[dst]:
+            return
+        distances[dst] = new_distance
+        self._set_parent(dst, src)
+
+        to_visit = [(new_distance, dst)]
+        while to_visit:
+            distance, vertex = heapq.heappop(to_visit)
+            if distance > distances[vertex]:
+                continue
+            self.affected += 1
+            for nxt, weight in self.graph._out_edges(vertex):
+                if distance + weight < distances[nxt]:
+                    distances[nxt] = distance + weight
+                    self._set_parent(nxt, vertex)
+                    heapq.heappush(to_visit, (distance + weight, nxt))
+
+    def _increase(self, root: int) -> None:
+        """
+        Handles a tree edge into "root" that got more expensive or was
+        removed. Only the vertices in the subtree of "root" can get longer
+        paths: they are cut off, each is seeded with its best edge from the
+        rest of the tree, and a Dijkstra search restricted to the subtree
+        settles them again.
+        """
+        distances = self.distances
+        graph = self.graph
+
+        # Collects the subtree and detaches it.
+        subtree = [root]
+        for vertex in subtree:
+            subtree.extend(self.children[vertex])
+        cut = set(subtree)
+        for vertex in subtree:
+            distances[vertex] = float('inf')
+            self._set_parent(vertex, None)
+        self.affected = len(subtree)
+
+        # Best way into each cut vertex from the part of the tree that kept
+        # its distances.
+        to_visit = []
+        for vertex in subtree:
+            for prev, weight in graph._in_edges(vertex):
+                if prev not in cut and distances[prev] + weight < distances[vertex]:
+                    distances[vertex] = distances[prev] + weight
+                    self._set_parent(vertex, prev)
+            if distances[vertex] != float('inf'):
+                heapq.heappush(to_visit, (distances[vertex], vertex))
+
+        # Dijkstra inside the subtree only.
+        while to_visit:
+            distance, vertex = heapq.heappop(to_visit)
+            if distance > distances[vertex]:
+                continue
+            for nxt, weight in graph._out_edges(vertex):
+                if nxt in cut and distance + weight < distances[nxt]:
+                    distances[nxt] = distance + weight
+                    self._set_parent(nxt, vertex)
+                    heapq.heappush(to_visit, (distance + weight, nxt))
+
+
+class LandmarkIndex:
+    """
+    Landmark (ALT) index of a DirectedGraph for point-to-point queries
+    - k landmark vertices are picked farthest-first
+    - for each landmark L it stores d(L, v) and d(v, L) for every vertex v
+    - by the triangle inequality, d(u, v) >= d(L, v) - d(L, u) and
+      d(u, v) >= d(u, L) - d(v, L); the largest of these bounds guides
+      shortest_path() as a bidirectional A* search
+    Unreachable distances are stored as the largest finite distance of
+    their row. The rows still satisfy d(L, w) <= d(L, u) + weight(u, w)
+    on every edge, so the bounds stay valid and consistent on graphs that
+    are not strongly connected.
+    The index belongs to one version of the graph. Once the graph changes,
+    queries fall back to a plain bidirectional search until rebuild().
+    """
+
+    def __init__(self, graph, k=8, seed=0):
+        """
+        Builds an index of up to "k" landmarks for "graph". Selection
+        starts from the vertex farthest from vertex "seed".
+        """
+        self.graph = graph
+        self.k = k
+        self.seed = seed
+        self.queries = 0
+        self.fallbacks = 0
+        self.touched = 0
+        self.data = None
+        self.rebuild()
+
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _build(graph, version, k, seed) -> dict:
+        """
+        Selects the landmarks of "graph" and computes their distance rows.
+        Returns the index data as a dictionary.
+        """
+        inf = float('inf')
+        v_count = graph.v_count
+        landmarks = []
+        forward = array('d')
+        backward = array('d')
+        if v_count == 0:
+            return LandmarkIndex._data(version, v_count, landmarks, forward, backward)
+
+        # Round trip distance from the nearest landmark so far (from the
+        # seed before the first one). The next landmark is the vertex with
+        # the largest finite value.
+        seed = seed if 0 <= seed < v_count else 0
+        to_seed = graph._dijkstra_search(seed, None)[0]
+        from_seed = graph._dijkstra_search(seed, None, reverse=True)[0]
+        score = [a + b for a, b in zip(to_seed, from_seed)]
+
+        while len(landmarks) < k:
+            # Prefers the farthest vertex with a finite score, then any
+            # vertex no landmark is connected to yet.
+            best, landmark, uncovered = 0, None, None
+            for vertex, value in enumerate(score):
+                if best < value < inf:
+                    best, landmark = value, vertex
+                elif value == inf and uncovered is None:
+                    uncovered = vertex
+            if landmark is None:
+                landmark = uncovered
+            if landmark is None:
+                break
+            landmarks.append(landmark)
+            from_landmark = graph._dijkstra_search(landmark, None)[0]
+            to_landmark = graph._dijkstra_search(landmark, None, reverse=True)[0]
+            for vertex in range(v_count):
+                value = from_landmark[vertex] + to_landmark[vertex]
+                if value < score[vertex]:
+                    score[vertex] = value
+            forward.extend(LandmarkIndex._capped(from_landmark))
+            backward.extend(LandmarkIndex._capped(to_landmark))
+        return LandmarkIndex._data(version, v_count, landmarks, forward, backward)
+
+    @staticmethod
+    def _capped(distances: []) -> []:
+        """
+        Returns "distances" with INFINITY replaced by the largest finite
+        value, which keeps the row a feasible potential.
+        """
+        inf = float('inf')
+        largest = max((value for value in distances if value != inf), default=0)
+        return [largest if value == inf else value for value in distances]
+
+    @staticmethod
+    def _data(version, v_count, landmarks, forward, backward) -> dict:
+        """
+        Bundles the index arrays with the offset of each landmark's row,
+        so the whole index can be swapped in one assignment.
+        """
+        return {
+            'version': version,
+            'v_count': v_count,
+            'landmarks': landmarks,
+            'forward': forward,
+            'backward': backward,
+            'rows': range(0, len(landmarks) * v_count, v_count) if v_count else range(0),
+        }
+
+    def rebuild(self, background=False):
+        """
+        Rebuilds the index for the current version of the graph.
+        If background is True, the graph's snapshot() is taken now and the
+        index is computed from it in a new thread, which is returned.
+        Queries keep running meanwhile (on the plain search if the old
+        index is stale) and switch to the new index once it is ready.
+        """
+        graph = self.graph
+        version = graph._version
+        if not background:
+            self.data = self._build(graph, version, self.k, self.seed)
+            return None
+
+        snapshot = graph.snapshot()
+
+        def build():
+            self.data = self._build(snapshot, version, self.k, self.seed)
+
+        thread = threading.Thread(target=build, name='landmark-index', daemon=True)
+        thread.start()
+        return thread
+
+    def is_stale(self) -> bool:
+        """
+        Returns True if the graph changed since the index was built.
+        """
+        return self.data['version'] != self.graph._version
+
+    # ------------------------------------------------------------------ #
+
+    def lower_bound(self, u: int, v: int):
+        """
+        Returns a lower bound on the length of the shortest path from "u"
+        to "v", the largest landmark bound (at least 0).
+        """
+        data = self.data
+        forward, backward = data['forward'], data['backward']
+        best = 0
+        for base in data['rows']:
+            bound = forward[base + v] - forward[base + u]
+            if bound > best:
+                best = bound
+            bound = backward[base + u] - backward[base + v]
+            if bound > best:
+                best = bound
+        return best
+
+    def shortest_path(self, src: int, dst: int):
+        """
+        Returns a tuple (distance, path) as DirectedGraph.shortest_path()
+        does, guided by the landmark bounds. Runs a plain bidirectional
+        search if the index is stale.
+        """
+        self.queries += 1
+        if self.is_stale():
+            self.fallbacks += 1
+            return self.graph.shortest_path(src, dst)
+
+        # shortest_path() computes the potential of each vertex it reaches
+        # once, with two heuristic calls.
+        calls = 0
+        lower_bound = self.lower_bound
+
+        def heuristic(u, v):
+            nonlocal calls
+            calls += 1
+            return lower_bound(u, v)
+
+        result = self.graph.shortest_path(src, dst, heuristic)
+        self.touched += calls // 2
+        return result
+
+    def evaluate(self, pairs) -> dict:
+        """
+        Takes in an iterable of (src, dst) pairs and runs each query with
+        and without the landmark bounds. Returns a dictionary with the
+        number of queries, the vertices reached in total by the plain
+        bidirectional search and by the guided one, and the reduction
+        (1 - guided / plain), to help size k against memory().
+        """
+        plain = guided = queries = 0
+        lower_bound = self.lower_bound
+        for src, dst in pairs:
+            counts = [0, 0]
+
+            def zero(u, v):
+                counts[0] += 1
+                return 0
+
+            def bound(u, v):
+                counts[1] += 1
+                return lower_bound(u, v)
+
+            self.graph.shortest_path(src, dst, zero)
+            self.graph.shortest_path(src, dst, bound)
+            plain += counts[0] // 2
+            guided += counts[1] // 2
+            queries += 1
+        return {
+            'queries': queries,
+            'plain_vertices': plain,
+            'guided_vertices': guided,
+            'reduction': 1 - guided / plain if plain else 0.0,
+        }
+
+    def memory(self) -> int:
+        """
+        Returns the size in bytes of the distance arrays.
+        """
+        data = self.data
+        return data['forward'].itemsize * (len(data['forward']) + len(data['backward']))
+
+    def stats(self) -> dict:
+        """
+        Returns a dictionary describing the index and its use: landmarks,
+        memory in bytes, whether it is stale, queries, fallbacks to the
+        plain search, and the mean number of vertices reached per guided
+        query.
+        """
+        data = self.data
+        guided = self.queries - self.fallbacks
+        return {
+            'landmarks': list(data['landmarks']),
+            'bytes': self.memory(),
+            'stale': self.is_stale(),
+            'queries': self.queries,
+            'fallbacks': self.fallbacks,
+            'mean_vertices': self.touched / guided if guided else 0.0,
+        }
+
+    # ------------------------------------------------------------------ #
+
+    def save(self, path) -> None:
+        """
+        Writes the index to the file at "path" in the binary format of
+        graph_io.
+        """
+        data = self.data
+        graph_io.write_file(path, graph_io.LANDMARKS, {
+            'meta': array('q', [len(data['landmarks']), data['v_count']]),
+            'landmarks': array('q', data['landmarks']),
+            'forward': array('d', data['forward']),
+            'backward': array('d', data['backward']),
+        })
+
+    @classmethod
+    def load(cls, path, graph, mmap=True):
+        """
+        Reads an index written by save() for "graph" from the file at
+        "path". The distance arrays are memory-mapped if mmap is True. The
+        index is taken to match the current version of the graph.
+        Raises ValueError if the file is not a landmark index or was built
+        for a graph with a different number of vertices.
+        """
+        kind, sections = graph_io.read_file(path, use_mmap=mmap)
+        if kind != graph_io.LANDMARKS:
+            raise ValueError(f"{path} does not hold a landmark index")
+        k, v_count = sections['meta']
+        if v_count != graph.v_count:
+            raise ValueError(f"index has {v_count} vertices, graph has {graph.v_count}")
+
+        index = cls.__new__(cls)
+        index.graph = graph
+        index.k = k
+        index.seed = 0
+        index.queries = index.fallbacks = index.touched = 0
+        index.data = cls._data(graph._version, v_count, list(sections['landmarks']),
+                               sections['forward'], sections['backward'])
+        return index
+
+
+class ReachabilityIndex:
+    """
+    Index answering "is there a path from u to v?" for a DirectedGraph
+    - strongly connected components are condensed to single nodes, since
+      every vertex of a component reaches the same vertices
+    - the transitive closure of the condensation is stored as one packed
+      bitset row per component, answering queries in O(1)
+    - if the closure would take more than max_bytes, pruned 2-hop labels
+      are built instead: u reaches v if some hub is reached from u and
+      reaches v
+    The index belongs to one version of the graph. Once the graph changes,
+    queries fall back to a search until rebuild().
+    """
+
+    def __init__(self, graph, max_bytes=1 << 26):
+        """
+        Builds the index for "graph", using the closure if it fits in
+        "max_bytes" bytes and 2-hop labels otherwise.
+        """
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        Rebuilds the index for the current version of the graph.
+        """
+        graph = self.graph
+        self.version = graph._version
+
+        # Component of each vertex. Components come in topological order,
+        # so a component only reaches components with a larger number.
+        components = graph.strongly_connected_components()
+        component = array('i', [0]) * graph.v_count
+        for number, members in enumerate(components):
+            for vertex in members:
+                component[vertex] = number
+        self.component = component
+
+        # Edges of the condensation, without duplicates.
+        successors = [set() for _ in components]
+        for src in range(graph.v_count):
+            for dst, _ in graph._out_edges(src):
+                if component[src] != component[dst]:
+                    successors[component[src]].add(component[dst])
+
+        # Row c only needs bits for components c and later, so the closure
+        # takes about half of C * C bits.
+        count = len(components)
+        closure_bytes = sum((count - number + 7) // 8 for number in range(count))
+        if closure_bytes <= self.max_bytes:
+            self.kind = 'closure'
+            self.rows = self._closure(successors)
+            self.labels_out = self.labels_in = None
+        else:
+            self.kind = 'labels'
+            self.rows = None
+            self.labels_out, self.labels_in = self._labels(successors)
+
+    @staticmethod
+    def _closure(successors: []) -> []:
+        """
+        Returns the closure rows of the condensation: row c is a bytes
+        bitset where bit i is set if component c reaches component c + i.
+        """
+        count = len(successors)
+        reach = [0] * count
+        rows = [b''] * count
+        # Reverse topological order, so successors are done first. Python
+        # integers serve as bitsets of any width while ORing.
+        for number in range(count - 1, -1, -1):
+            bits = 1 << number
+            for other in successors[number]:
+                bits |= reach[other]
+            reach[number] = bits
+            rows[number] = (bits >> number).to_bytes((count - number + 7) // 8, 'little')
+        return rows
+
+    @staticmethod
+    def _labels(successors: []) -> tuple:
+        """
+        Returns the pruned 2-hop labels (labels_out, labels_in) of the
+        condensation: labels_out[c] holds the hubs c reaches and labels_in[c]
+        the hubs that reach c, so c reaches d exactly when the two sets
+        share a hub. Hubs are processed by descending degree, and each search
+        stops at nodes the labels built so far already cover.
+        """
+        count = len(successors)
+        predecessors = [[] for _ in range(count)]
+        for number, others in enumerate(successors):
+            for other in others:
+                predecessors[other].append(number)
+        order = sorted(range(count), key=lambda c: -(len(successors[c]) + 1) * (len(predecessors[c]) + 1))
+
+        labels_out = [set() for _ in range(count)]
+        labels_in = [set() for _ in range(count)]
+        for hub in order:
+            # Forward: every node the hub reaches gets it as an in-hub.
+            to_visit = deque([hub])
+            seen = {hub}
+            while to_visit:
+                node = to_visit.popleft()
+                if node != hub and not labels_out[hub].isdisjoint(labels_in[node]):
+                    continue
+                labels_in[node].add(hub)
+                for other in successors[node]:
+                    if other not in seen:
+                        seen.add(other)
+                        to_visit.append(other)
+
+            # Backward: every node reaching the hub gets it as an out-hub.
+            to_visit = deque([hub])
+            seen = {hub}
+            while to_visit:
+                node = to_visit.popleft()
+                if node != hub and not labels_out[node].isdisjoint(labels_in[hub]):
+                    continue
+                labels_out[node].add(hub)
+                for other in predecessors[node]:
+                    if other not in seen:
+                        seen.add(other)
+                        to_visit.append(other)
+
+        return [frozenset(label) for label in labels_out], [frozenset(label) for label in labels_in]
+
+    def is_stale(self) -> bool:
+        """
+        Returns True if the graph changed since the index was built.
+        """
+        return self.version != self.graph._version
+
+    def reachable(self, u: int, v: int) -> bool:
+        """
+        Takes in two integers "u" and "v" representing vertices and returns
+        True if there is a path from "u" to "v" (every vertex reaches
+        itself), and False otherwise or if either vertex does not exist.
+        """
+        if u < 0 or u > self.graph.v_count - 1 or v < 0 or v > self.graph.v_count - 1:
+            return False
+        if self.is_stale():
+            for vertex in self.graph.iter_bfs(u, v, ordered=False):
+                if vertex == v:
+                    return True
+            return False
+        source, target = self.component[u], self.component[v]
+        if self.rows is not None:
+            offset = target - source
+            return offset >= 0 and self.rows[source][offset >> 3] >> (offset & 7) & 1 == 1
+        return not self.labels_out[source].isdisjoint(self.labels_in[target])
+
+    def reachable_many(self, pairs) -> []:
+        """
+        Takes in an iterable of (u, v) pairs and returns a list of booleans,
+        the reachable() answer for each pair. Lookups are done in one loop
+        with the index arrays bound locally, without a method call per pair.
+        """
+        if self.is_stale():
+            return [self.reachable(u, v) for u, v in pairs]
+        v_count = self.graph.v_count
+        component = self.component
+        results = []
+        append = results.append
+        if self.rows is not None:
+            rows = self.rows
+            for u, v in pairs:
+                if 0 <= u < v_count and 0 <= v < v_count:
+                    source = component[u]
+                    offset = component[v] - source
+                    append(offset >= 0 and rows[source][offset >> 3] >> (offset & 7) & 1 == 1)
+                else:
+                    append(False)
+        else:
+            labels_out, labels_in = self.labels_out, self.labels_in
+            for u, v in pairs:
+                if 0 <= u < v_count and 0 <= v < v_count:
+                    append(not labels_out[component[u]].isdisjoint(labels_in[component[v]]))
+                else:
+                    append(False)
+        return results
+
+    def memory(self) -> int:
+        """
+        Returns the approximate size of the index in bytes: the component
+        map plus the closure rows or the label sets.
+        """
+        size = sys.getsizeof(self.component)
+        if self.rows is not None:
+            size += sys.getsizeof(self.rows) + sum(sys.getsizeof(row) for row in self.rows)
+        else:
+            for labels in (self.labels_out, self.labels_in):
+                size += sys.getsizeof(labels) + sum(sys.getsizeof(label) for label in labels)
+        return size
+
+    def stats(self) -> dict:
+        """
+        Returns a dictionary describing the index: kind ('closure' or
+        'labels'), components, memory in bytes, whether it is stale, and for
+        labels the mean number of hubs per label.
+        """
+        result = {
+            'kind': self.kind,
+            'components': len(self.rows) if self.rows is not None else len(self.labels_in),
+            'bytes': self.memory(),
+            'stale': self.is_stale(),
+        }
+        if self.rows is None and self.labels_in:
+            total = sum(map(len, self.labels_in)) + sum(map(len, self.labels_out))
+            result['mean_label'] = total / (2 * len(self.labels_in))
+        return result
+
+
+class DeltaStepping:
+    """
+    Single-source shortest path engine for a DirectedGraph, using
+    delta-stepping (Meyer and Sanders)
+    - the out-edges of every vertex are split once into light (weight at
+      most delta) and heavy lists, so a search neither scans matrix rows
+      nor tests weights
+    - tentative distances sit in buckets of width delta instead of a heap;
+      buckets are settled in ascending order, light edges are relaxed in
+      phases until the bucket stays empty, and heavy edges, which can only
+      reach later buckets, once afterwards
+    The split costs one pass over the edges and O(E) memory, and pays off
+    over many searches on an unchanged graph. A search on a changed graph
+    splits the edges again first.
+    """
+
+    def __init__(self, graph, delta=None):
+        """
+        Builds the engine for "graph" with bucket width "delta" (default:
+        the mean edge weight divided by the mean out-degree, no less than
+        the smallest weight). Small values approach Dijkstra, large values
+        approach Bellman-Ford.
+        Raises ValueError if delta is not positive.
+        """
+        if delta is not None and delta <= 0:
+            raise ValueError("delta must be positive")
+        self.graph = graph
+        self.requested_delta = delta
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        Splits the edges of the current version of the graph again.
+        """
+        graph = self.graph
+        version = graph._version
+        edges = [list(graph._out_edges(src)) for src in range(graph.v_count)]
+
+        delta = self.requested_delta
+        if delta is None:
+            count = sum(map(len, edges))
+            if count:
+                total = sum(weight for row in edges for _, weight in row)
+                smallest = min(weight for row in edges for _, weight in row)
+                delta = max(total / count / (count / graph.v_count), smallest)
+            else:
+                delta = 1
+
+        # The version is set last, so a reader never sees it matched to
+        # half-replaced edge lists.
+        self.light = [[(dst, weight) for dst, weight in row if weight <= delta] for row in edges]
+        self.heavy = [[(dst, weight) for dst, weight in row if weight > delta] for row in edges]
+        self.delta = delta
+        self.version = version
+
+    def is_stale(self) -> bool:
+        """
+        Returns True if the graph changed since the edges were split.
+        """
+        return self.version != self.graph._version
+
+    def distances(self, src: int) -> []:
+        """
+        Takes in an integer "src" representing the starting vertex and
+        returns the same list of shortest path lengths as dijkstra().
+        Raises ValueError if src is not a vertex of the graph.
+        """
+        if self.is_stale():
+            self.rebuild()
+        v_count = len(self.light)
+        if src < 0 or src > v_count - 1:
+            raise ValueError(f"source {src} is not in the graph")
+
+        delta = self.delta
+        light, heavy = self.light, self.heavy
+        distances = [float('inf')] * v_count
+        distances[src] = 0
+
+        # Distance each vertex had when its edges were last relaxed, so a
+        # vertex queued twice without improving is not relaxed twice.
+        relaxed_at = [None] * v_count
+
+        # Bucket index -> list of vertices queued in it, plus a heap of the
+        # indices of non-empty buckets to find the lowest one. A vertex whose
+        # distance improves is queued in its new bucket; its entry in the old
+        # bucket becomes stale and is skipped.
+        buckets = {0: [src]}
+        indices = [0]
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        while indices:
+            index = heappop(indices)
+            settled = []
+
+            # Light edge phases. Relaxing a light edge can put a vertex back
+            # into the current bucket, so repeats until it stays empty.
+            bucket = buckets.pop(index, None)
+            while bucket:
+                for vertex in bucket:
+                    distance = distances[vertex]
+                    if relaxed_at[vertex] == distance:
+                        continue
+                    relaxed_at[vertex] = distance
+                    settled.append(vertex)
+                    for dst, weight in light[vertex]:
+                        new_distance = distance + weight
+                        if new_distance < distances[dst]:
+                            distances[dst] = new_distance
+                            new_index = int(new_distance // delta)
+                            queued = buckets.get(new_index)
+                            if queued is None:
+                                buckets[new_index] = [dst]
+                                heappush(indices, new_index)
+                            else:
+                                queued.append(dst)
+                bucket = buckets.pop(index, None)
+
+            # Heavy edges, once the bucket's distances are final.
+            for vertex in settled:
+                distance = distances[vertex]
+                for dst, weight in heavy[vertex]:
+                    new_distance = distance + weight
+                    if new_distance < distances[dst]:
+                        distances[dst] = new_distance
+                        new_index = int(new_distance // delta)
+                        queued = buckets.get(new_index)
+                        if queued is None:
+                            buckets[new_index] = [dst]
+                            heappush(indices, new_index)
+                        else:
+                            queued.append(dst)
+
+        return distances
+
+    def memory(self) -> int:
+        """
+        Returns the approximate size in bytes of the light and heavy edge
+        lists.
+        """
+        size = 0
+        for rows in (self.light, self.heavy):
+            size += sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+            size += sum(sys.getsizeof(edge) for row in rows for edge in row)
+        return size
+
 
 class DirectedGraph:
     """
@@ -17,6 +1073,35 @@ class DirectedGraph:
     - vertex names are integers
     """
 
+    # Modification counter, bumped by every mutating method, the optional
+    # dijkstra() result cache and the optional incremental cycle check.
+    # Declared on the class so __init__ is unchanged.
+    _version = 0
+    _path_cache = None
+    _cycle_check = None
+
+    # Per-vertex destination tuples in ascending order, used by ordered
+    # traversals. Entries are dropped when the vertex's out-edges change.
+    _sorted_out = None
+
+    # Sink receiving an instrumentation.CallRecord per search call, or None
+    # while instrumentation is disabled.
+    _instrumentation = None
+
+    # (version, CSRDirectedGraph) pair last returned by snapshot().
+    _snapshot = None
+
+    # (version, {(src, dst): weight}) pair, the edge index of
+    # validate_paths().
+    _edge_index = None
+
+    # Source vertex -> ShortestPathTree kept up to date by the mutating
+    # methods, see track_shortest_paths().
+    _trees = None
+
+    # DeltaStepping engine last used by delta_stepping().
+    _delta_engine = None
+
     def __init__(self, start_edges=None):
         """
         Store graph info as adjacency matrix
@@ -60,21 +1145,71 @@ class DirectedGraph:
         Adds a vertex to the graph and returns an integer representing the
         number of vertices in the graph.
         """
-        # Creates list of zeros representing the new vertex's connection to
-        # the other vertices in the graph.
-        vertex_list = [0] * (self.v_count + 1)
-
-        # Increments v_count for new vertex
+        # Adds storage for the new vertex, then increments v_count for it.
+        self._append_vertices(1)
         self.v_count += 1
+        self._version += 1
+
+        # A vertex without edges can go anywhere in a topological order.
+        if self._cycle_check is not None:
+            self._cycle_check.add_vertices()
+        if self._trees:
+            for tree in self._trees.values():
+                tree.add_vertices()
+        return self.v_count
 
-        # Adds 0 to each existing list in the graph, representing the connection
-        # to the new vertex.
+    def _append_vertices(self, count: int) -> None:
+        """
+        Storage primitive. Adds "count" edgeless vertices, numbered from
+        v_count on, to the storage. v_count itself is updated by the caller.
+        """
+        new_size = self.v_count + count
+
+        # Adds 0s to each existing list in the graph, representing the
+        # connection to the new vertices.
+        zeros = [0] * count
         for val in self.adj_matrix:
-            val.append(0)
+            val.extend(zeros)
 
-        # Adds the list representing new vertex to the graph.
-        self.adj_matrix.append(vertex_list)
-        return self.v_count
+        # Adds a list of zeros for each new vertex, representing its
+        # connection to every vertex in the graph.
+        for _ in range(count):
+            self.adj_matrix.append([0] * new_size)
+
+    def _set_weight(self, src: int, dst: int, weight: int) -> None:
+        """
+        Storage primitive. Stores "weight" as the weight of the edge from
+        "src" to "dst", where a weight of 0 means there is no edge. Both
+        vertices are assumed to be valid.
+        """
+        self.adj_matrix[src][dst] = weight
+
+    def _weight(self, src: int, dst: int) -> int:
+        """
+        Storage primitive. Returns the weight of the edge from "src" to
+        "dst", or 0 if there is no such edge.
+        """
+        return self.adj_matrix[src][dst]
+
+    def _out_edges(self, src: int):
+        """
+        Storage primitive. Yields a (destination vertex, weight) pair for
+        each edge leaving "src". The dense matrix yields them in ascending
+        order of destination vertex.
+        """
+        for dst, weight in enumerate(self.adj_matrix[src]):
+            if weight != 0:
+                yield dst, weight
+
+    def _in_edges(self, dst: int):
+        """
+        Storage primitive. Yields a (source vertex, weight) pair for each
+        edge entering "dst". The dense matrix has to scan a full column.
+        """
+        for src in range(self.v_count):
+            weight = self.adj_matrix[src][dst]
+            if weight != 0:
+                yield src, weight
 
 
     def add_edge(self, src: int, dst: int, weight=1) -> None:
@@ -99,10 +1234,112 @@ class DirectedGraph:
         if src == dst:
             return
 
+        # In incremental cycle check mode, a new edge first updates the
+        # maintained topological order. Weight updates cannot add a cycle.
+        if self._cycle_check is not None and self._weight(src, dst) == 0:
+            self._cycle_check.add_edge(src, dst)
+
+        # Tracked shortest path trees need the old weight to repair
+        # themselves.
+        old_weight = self._weight(src, dst) if self._trees else None
+
         # Adds edge between vertices
-        self.adj_matrix[src][dst] = weight
+        if self._sorted_out is not None:
+            self._sorted_out.pop(src, None)
+        self._set_weight(src, dst, weight)
+        self._version += 1
+
+        if self._trees and old_weight != weight:
+            for tree in self._trees.values():
+                tree.update_edge(src, dst, old_weight, weight)
+
+
+    @classmethod
+    def from_edge_list(cls, edges):
+        """
+        Takes in an iterable of (src, dst, weight) tuples and returns a new
+        graph holding those edges, built with add_edges_from(). Unlike passing
+        the edges to the constructor, storage is sized once up front.
+        """
+        graph = cls()
+        graph.add_edges_from(edges)
+        return graph
 
+    @classmethod
+    def from_edge_file(cls, path, **options):
+        """
+        Takes in the path of a text file with one "src dst weight" edge per
+        line (weight optional) and returns a new graph holding those edges.
+        The file is streamed in chunks through add_edges_from(); see
+        graph_io.read_edge_file() for the accepted options.
+        """
+        graph = cls()
+        graph_io.read_edge_file(path, graph, directed=True, **options)
+        return graph
 
+    def add_edges_from(self, edges) -> int:
+        """
+        Takes in an iterable of (src, dst, weight) tuples and adds them to
+        the graph in bulk. As with the constructor, the graph first grows to
+        include the largest vertex named in any edge; the storage is resized
+        once instead of one add_vertex() call per vertex. Each edge is then
+        handled as add_edge() would: edges with a negative vertex, a
+        non-positive weight or the same source and destination are skipped,
+        and a repeated edge keeps its last weight.
+        Returns the number of edges accepted, counting a repeated edge each
+        time it appears.
+        If the incremental cycle check is enabled, edges go through
+        add_edge() one by one so that each can be checked; a rejected edge
+        raises CycleError and leaves the edges before it in place.
+        """
+        # Two passes are needed (size, then fill), so the input is read once
+        # into a list unless it already is one.
+        if not isinstance(edges, (list, tuple)):
+            edges = list(edges)
+
+        # Pass 1: finds the largest vertex and grows the storage once.
+        v_count = self.v_count
+        for src, dst, _ in edges:
+            if src >= v_count:
+                v_count = src + 1
+            if dst >= v_count:
+                v_count = dst + 1
+        if v_count > self.v_count:
+            self._append_vertices(v_count - self.v_count)
+            self.v_count = v_count
+            if self._cycle_check is not None:
+                self._cycle_check.add_vertices()
+            if self._trees:
+                for tree in self._trees.values():
+                    tree.add_vertices()
+        self._version += 1
+
+        # The incremental cycle check has to see the edges one at a time.
+        if self._cycle_check is not None:
+            stored = 0
+            for src, dst, weight in edges:
+                if src >= 0 and dst >= 0 and src != dst and weight >= 1:
+                    self.add_edge(src, dst, weight)
+                    stored += 1
+            return stored
+
+        # Pass 2: validates and stores every edge without going through
+        # add_edge(). The storage itself deduplicates repeated edges.
+        stored = 0
+        set_weight = self._set_weight
+        for src, dst, weight in edges:
+            if src < 0 or dst < 0 or src == dst or weight < 1:
+                continue
+            set_weight(src, dst, weight)
+            stored += 1
+
+        # Sorted neighbour tuples may be stale for any vertex, and tracked
+        # trees are cheaper to rebuild than to repair edge by edge.
+        self._sorted_out = None
+        if self._trees:
+            for tree in self._trees.values():
+                tree.rebuild()
+        return stored
 
     def remove_edge(self, src: int, dst: int) -> None:
         """
@@ -120,7 +1357,18 @@ class DirectedGraph:
             return
 
         # Deletes edge between vertices, if edge exists
-        self.adj_matrix[src][dst] = 0
+        old_weight = self._weight(src, dst)
+        existed = old_weight != 0
+        if self._sorted_out is not None:
+            self._sorted_out.pop(src, None)
+        self._set_weight(src, dst, 0)
+        self._version += 1
+
+        if existed and self._cycle_check is not None:
+            self._cycle_check.remove_edge()
+        if existed and self._trees:
+            for tree in self._trees.values():
+                tree.update_edge(src, dst, old_weight, 0)
 
 
     def get_vertices(self) -> []:
@@ -142,9 +1390,8 @@ class DirectedGraph:
         """
         return_list = []
         for row in range(self.v_count):
-            for column in range(self.v_count):
-                if self.adj_matrix[row][column] != 0:
-                    return_list.append((row,column,self.adj_matrix[row][column]))
+            for column, weight in self._out_edges(row):
+                return_list.append((row, column, weight))
         return return_list
 
     def is_valid_path(self, path: []) -> bool:
@@ -159,16 +1406,73 @@ class DirectedGraph:
         if path == []:
             return True
 
+        # Every vertex must exist. Without this check a negative index would
+        # wrap around the matrix and a too large one would raise IndexError.
+        for index in path:
+            if index < 0 or index > self.v_count - 1:
+                return False
+
         # Iterates through the list "path". If any any point there is not
         # a weighted edge from current index in path to the next index in path,
         # returns False immediately. Returns True if iteration successfully completes.
         for num in range(len(path) - 1):
             index = path[num]
             next_index = path[num + 1]
-            if self.adj_matrix[index][next_index] == 0:
+            if self._weight(index, next_index) == 0:
                 return False
         return True
 
+    def validate_paths(self, paths, weights=False):
+        """
+        Takes in an iterable of paths (lists of integer vertices) and
+        returns a list of booleans, is_valid_path() of each path. If
+        "weights" is True, returns a tuple (valid, totals) instead, where
+        totals holds the total weight of each path (INFINITY if invalid, 0
+        for a path of fewer than two vertices).
+        Every hop is looked up in a hashed (src, dst) -> weight index,
+        built once per version of the graph, so a whole path is checked by
+        C-level map() and zip() calls instead of a Python loop per hop.
+        """
+        index = self._edges_by_pair()
+        contains = index.__contains__
+        get = index.get
+        vertices = range(self.v_count)
+        valid = []
+        totals = [] if weights else None
+
+        for path in paths:
+            if len(path) < 2:
+                # No hop to check, only that the vertex exists.
+                ok = len(path) == 0 or path[0] in vertices
+                total = 0 if ok else float('inf')
+            elif not weights:
+                # Vertices outside the graph have no entry in the index.
+                ok = all(map(contains, zip(path, path[1:])))
+            else:
+                hops = list(map(get, zip(path, path[1:])))
+                ok = None not in hops
+                total = sum(hops) if ok else float('inf')
+            valid.append(ok)
+            if weights:
+                totals.append(total)
+
+        return (valid, totals) if weights else valid
+
+    def _edges_by_pair(self) -> dict:
+        """
+        Returns a dictionary mapping (src, dst) to the weight of every edge,
+        cached until the graph changes.
+        """
+        cached = self._edge_index
+        if cached is None or cached[0] != self._version:
+            index = dict()
+            for src in range(self.v_count):
+                for dst, weight in self._out_edges(src):
+                    index[(src, dst)] = weight
+            cached = (self._version, index)
+            self._edge_index = cached
+        return cached[1]
+
 
     def dfs(self, v_start, v_end=None) -> []:
         """
@@ -184,51 +1488,7 @@ class DirectedGraph:
         When multiple vertices are available for traversal during the search,
         vertices will be traversed in ascending order.
         """
-
-        # If starting vertex is not in graph, returns empty list.
-        if v_start < 0 or v_start > self.v_count - 1:
-            return []
-
-        # If a non-existent ending vertex is provided, ignores it.
-        if v_end and (v_end < 0 or v_end > self.v_count - 1):
-            v_end = None
-
-        # Initializes list for storing visited vertices, and to_visit
-        # stack for storing vertices not yet visited.
-        visited = []
-        to_visit = deque()
-        to_visit.append(v_start)
-
-        # While stack is not empty (aka v_end has not been reached, if
-        # it is defined, and there are still vertices to traverse):
-        while to_visit:
-            # Pops current vertex off of top of stack. If it is v_end,
-            # and v_end has been provided by the user as a valid vertex,
-            # returns visited list immediately.
-            curr_vertex = to_visit.pop()
-            if v_end and curr_vertex == v_end:
-                visited.append(curr_vertex)
-                return visited
-            # If current vertex has been previously traversed, immediately
-            # continues on to popping the next vertex off of the stack.
-            if curr_vertex not in visited:
-                visited.append(curr_vertex)
-            else:
-                continue
-            # Stores vertices adjacent to current vertex in a new list, in
-            # reverse alphabetical order.
-            curr_vertex_list = []
-            curr_row = self.adj_matrix[curr_vertex]
-            for column in range(len(curr_row)):
-                if curr_row[column] != 0:
-                    curr_vertex_list.append(column)
-            curr_vertex_list.sort(reverse = True)
-            # Adds vertices in the sorted vertices list to the top of the stack.
-            # This way, vertices are put onto the stack in descending lexicographical
-            # order such that the lowest value vertex is at the top of the stack.
-            for value in curr_vertex_list:
-                to_visit.append(value)
-        return visited
+        return list(self.iter_dfs(v_start, v_end))
 
 
     def bfs(self, v_start, v_end=None) -> []:
@@ -245,101 +1505,512 @@ class DirectedGraph:
         When multiple vertices are available for traversal during the search,
         vertices will be traversed in ascending order.
         """
+        return list(self.iter_bfs(v_start, v_end))
 
-        # If starting vertex is not in graph, returns empty list.
+    def iter_dfs(self, v_start, v_end=None, ordered=True):
+        """
+        Generator version of dfs(). Yields the vertices visited during a
+        depth-first search one at a time, so the caller can stop early or
+        stream them without the full visit list being built.
+        If ordered is True, vertices are traversed in ascending order, as in
+        dfs(). Otherwise neighbours are taken in storage order, which skips
+        sorting entirely.
+        The graph must not be modified while the generator is in use.
+        """
+        # If starting vertex is not in graph, yields nothing.
         if v_start < 0 or v_start > self.v_count - 1:
-            return []
+            return
 
         # If a non-existent ending vertex is provided, ignores it.
-        if v_end and (v_end <0 or v_end > self.v_count - 1):
+        if v_end is not None and (v_end < 0 or v_end > self.v_count - 1):
             v_end = None
 
-        # Initializes list for storing visited vertices, and to_visit
-        # queue for storing vertices not yet visited.
-        visited = []
-        to_visit = deque()
-        to_visit.append(v_start)
+        # Initializes a bitmap of visited vertices, and to_visit stack for
+        # storing vertices not yet visited.
+        visited = bytearray(self.v_count)
+        to_visit = [v_start]
+
+        # Stack and neighbour functions, swapped for counting wrappers when
+        # instrumentation is enabled so the loop itself is unchanged.
+        pop, push = to_visit.pop, to_visit.append
+        sorted_out, out_edges = self._sorted_out_neighbours, self._out_edges
+        probe = None
+        if self._instrumentation is not None:
+            probe = instrumentation.Probe('dfs', self._instrumentation)
+            pop, push = probe.counting_pop(pop), probe.counting_push(push)
+            sorted_out, out_edges = probe.counting_edges(sorted_out), probe.counting_edges(out_edges)
+
+        try:
+            # While stack is not empty (aka v_end has not been reached, if
+            # it is defined, and there are still vertices to traverse):
+            while to_visit:
+                # Pops current vertex off of top of stack. If it has been
+                # previously traversed, continues on to the next vertex.
+                curr_vertex = pop()
+                if visited[curr_vertex]:
+                    continue
+                visited[curr_vertex] = 1
+                yield curr_vertex
+
+                # Stops once v_end has been reached.
+                if curr_vertex == v_end:
+                    return
+
+                # Adds unvisited neighbours to the top of the stack in
+                # descending order, such that the lowest value vertex is at
+                # the top.
+                if ordered:
+                    neighbours = reversed(sorted_out(curr_vertex))
+                else:
+                    neighbours = [dst for dst, _ in out_edges(curr_vertex)]
+                for value in neighbours:
+                    if not visited[value]:
+                        push(value)
+        finally:
+            if probe is not None:
+                probe.finish(visited.count(1))
+
+    def iter_bfs(self, v_start, v_end=None, ordered=True):
+        """
+        Generator version of bfs(). Yields the vertices visited during a
+        breadth-first search one at a time, so the caller can stop early or
+        stream them without the full visit list being built.
+        If ordered is True, vertices are traversed in ascending order, as in
+        bfs(). Otherwise neighbours are taken in storage order, which skips
+        sorting entirely.
+        The graph must not be modified while the generator is in use.
+        """
+        # If starting vertex is not in graph, yields nothing.
+        if v_start < 0 or v_start > self.v_count - 1:
+            return
 
-        # While stack is not empty (aka v_end has not been reached, if
-        # it is defined, and there are still vertices to traverse):
-        while to_visit:
-            # Pops current vertex off of left end of queue. If it is v_end,
-            # and v_end has been provided by the user as a valid vertex,
-            # returns visited list immediately.
-            curr_vertex = to_visit.popleft()
-            if v_end and curr_vertex == v_end:
-                visited.append(curr_vertex)
-                return visited
-            # If current vertex has been previously traversed, immediately
-            # continues on to popping the next vertex off of the stack.
-            if curr_vertex not in visited:
-                visited.append(curr_vertex)
-            else:
-                continue
-            # Stores vertices adjacent to current vertex in a new list, in
-            # reverse alphabetical order.
-            curr_vertex_list = []
-            curr_row = self.adj_matrix[curr_vertex]
-            for column in range(len(curr_row)):
-                if curr_row[column] != 0:
-                    curr_vertex_list.append(column)
-            curr_vertex_list.sort()
-            # Adds vertices in the sorted vertices list to the right end of the queue.
-            # This way, vertices are put into the queue in ascending lexicographical
-            # order such that the lowest value vertex towards the left of the queue.
-            for value in curr_vertex_list:
-                to_visit.append(value)
-        return visited
+        # If a non-existent ending vertex is provided, ignores it.
+        if v_end is not None and (v_end < 0 or v_end > self.v_count - 1):
+            v_end = None
+
+        # Vertices are marked as discovered when queued, so each vertex
+        # enters the queue once. This visits them in the same order as
+        # marking them when popped would.
+        discovered = bytearray(self.v_count)
+        discovered[v_start] = 1
+        to_visit = deque([v_start])
+
+        # Queue and neighbour functions, swapped for counting wrappers when
+        # instrumentation is enabled so the loop itself is unchanged.
+        pop, push = to_visit.popleft, to_visit.append
+        sorted_out, out_edges = self._sorted_out_neighbours, self._out_edges
+        probe = None
+        if self._instrumentation is not None:
+            probe = instrumentation.Probe('bfs', self._instrumentation)
+            pop, push = probe.counting_pop(pop), probe.counting_push(push)
+            sorted_out, out_edges = probe.counting_edges(sorted_out), probe.counting_edges(out_edges)
+
+        try:
+            while to_visit:
+                # Pops current vertex off of left end of queue.
+                curr_vertex = pop()
+                yield curr_vertex
+
+                # Stops once v_end has been reached.
+                if curr_vertex == v_end:
+                    return
+
+                # Adds undiscovered neighbours to the right end of the queue
+                # in ascending order.
+                if ordered:
+                    neighbours = sorted_out(curr_vertex)
+                else:
+                    neighbours = [dst for dst, _ in out_edges(curr_vertex)]
+                for value in neighbours:
+                    if not discovered[value]:
+                        discovered[value] = 1
+                        push(value)
+        finally:
+            # Every popped vertex is visited; nothing is stale in a BFS.
+            if probe is not None:
+                probe.finish(probe.pops)
+
+    def _sorted_out_neighbours(self, src: int) -> tuple:
+        """
+        Returns the destinations of the edges leaving "src" as a tuple in
+        ascending order. Sorted tuples are cached per vertex until one of its
+        out-edges is added or removed, so repeated ordered traversals do not
+        sort again.
+        """
+        if self._sorted_out is None:
+            self._sorted_out = dict()
+        neighbours = self._sorted_out.get(src)
+        if neighbours is None:
+            neighbours = tuple(sorted(dst for dst, _ in self._out_edges(src)))
+            self._sorted_out[src] = neighbours
+        return neighbours
 
     def has_cycle(self) -> bool:
         """
         Takes no input and returns True if the graph contains at least one
         cycle, and False otherwise.
-        Utilizes Kahn's Algorithm.
+        Utilizes Kahn's Algorithm through topological_sort().
         """
+        # Incremental cycle check mode already knows the answer.
+        if self._cycle_check is not None:
+            return self._cycle_check.cycle is not None
 
-        # Finds all edges and all vertices in graph
-        all_edges = self.get_edges()
-        all_vertices = self.get_vertices()
+        order, _ = self.topological_sort()
+        return order is None
 
-        # Initializes and populates a list containing
-        # the number of degrees (vertices pointing to this
-        # vertex) for all vertices.
-        degree_list = [0] * len(all_vertices)
-        for edge in all_edges:
-            degree_list[edge[1]] += 1
+    def topological_sort(self) -> tuple:
+        """
+        Takes no input and returns a tuple (order, cycle).
+        If the graph has no cycle, order is a list of all vertices such that
+        every edge goes from an earlier vertex to a later one, and cycle is
+        None. Otherwise order is None and cycle is a list of vertices forming
+        a cycle, with its first vertex repeated at the end so that
+        is_valid_path(cycle) is True.
+        Utilizes Kahn's Algorithm in O(V + E) time, or returns the order
+        maintained by the incremental cycle check in O(V) if it is enabled.
+        """
+        if self._cycle_check is not None:
+            return self._cycle_check.result()
+
+        # Initializes and populates a list containing the number of
+        # degrees (vertices pointing to this vertex) for all vertices.
+        degree_list = [0] * self.v_count
+        for vertex in range(self.v_count):
+            for dst, _ in self._out_edges(vertex):
+                degree_list[dst] += 1
 
-        # Initializes a queue for traversing vertices with
-        # 0 degree. Iterates through degree_list and appends
-        # all vertices with 0 degrees to the queue.
+        # Initializes a queue for traversing vertices with 0 degree.
         no_dependency_queue = deque()
-        for val in range(len(degree_list)):
-            if degree_list[val] == 0:
-                no_dependency_queue.append(val)
-
-        # While queue is not empty, pop vertex from left of queue.
-        # For each destination vertex that this vertex points to,
-        # subtract 1 from the degree of the destination vertex. If
-        # the destination vertex now has 0 degrees, appends it to the
-        # queue. Continues until no more vertices are left in the queue.
-        # At this point, any vertex with a degree > 0 is in a cycle, where
-        # in order to remove vertex A, vertex B must be removed, but vertex B
-        # points to vertex A.
+        for vertex in range(self.v_count):
+            if degree_list[vertex] == 0:
+                no_dependency_queue.append(vertex)
+
+        # While queue is not empty, pop vertex from left of queue and add it
+        # to the order. For each destination vertex that this vertex points
+        # to, subtract 1 from the degree of the destination vertex. If the
+        # destination vertex now has 0 degrees, appends it to the queue.
+        order = []
         while no_dependency_queue:
             curr_vertex = no_dependency_queue.popleft()
-            for edge in all_edges:
-                if edge[0] == curr_vertex:
-                    degree_list[edge[1]] -= 1
-                    if degree_list[edge[1]] == 0:
-                        no_dependency_queue.append(edge[1])
-        # If any vertex has a degree > 0 , cycle exists, returns True
-        for val in range(len(degree_list)):
-            if degree_list[val] != 0:
-                return True
-        return False
+            order.append(curr_vertex)
+            for dst, _ in self._out_edges(curr_vertex):
+                degree_list[dst] -= 1
+                if degree_list[dst] == 0:
+                    no_dependency_queue.append(dst)
+
+        if len(order) == self.v_count:
+            return order, None
+
+        # Every vertex left with a degree > 0 still has an incoming edge from
+        # another such vertex. Walking those edges backwards must therefore
+        # revisit a vertex, and the walk from that vertex on is a cycle.
+        vertex = next(v for v in range(self.v_count) if degree_list[v] > 0)
+        position = dict()
+        walk = []
+        while vertex not in position:
+            position[vertex] = len(walk)
+            walk.append(vertex)
+            for src, _ in self._in_edges(vertex):
+                if degree_list[src] > 0:
+                    vertex = src
+                    break
+
+        # The walk followed edges backwards, so reverses it to get the cycle
+        # in edge direction.
+        cycle = walk[position[vertex]:]
+        cycle.reverse()
+        cycle.append(cycle[0])
+        return None, cycle
+
+    def strongly_connected_components(self) -> []:
+        """
+        Takes no input and returns a list of strongly connected components,
+        each a list of vertices. Components are listed in topological order
+        of the condensation: an edge between two components always goes from
+        an earlier component to a later one.
+        Utilizes an iterative version of Tarjan's algorithm, so deep graphs do
+        not hit the recursion limit. Runs in O(V + E) time.
+        """
+        # Discovery index and lowest reachable index of each vertex (-1 when
+        # not yet discovered), and the Tarjan stack of open vertices.
+        index = [-1] * self.v_count
+        low = [0] * self.v_count
+        on_stack = [False] * self.v_count
+        stack = []
+        components = []
+        counter = 0
+
+        for root in range(self.v_count):
+            if index[root] != -1:
+                continue
+
+            # Explicit DFS stack of (vertex, iterator over its out-edges), in
+            # place of recursive calls.
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, iter(self._out_edges(root)))]
+
+            while work:
+                vertex, edges = work[-1]
+
+                # Resumes scanning the out-edges of vertex until it finds an
+                # undiscovered vertex to descend into.
+                descended = False
+                for dst, _ in edges:
+                    if index[dst] == -1:
+                        index[dst] = low[dst] = counter
+                        counter += 1
+                        stack.append(dst)
+                        on_stack[dst] = True
+                        work.append((dst, iter(self._out_edges(dst))))
+                        descended = True
+                        break
+                    if on_stack[dst] and index[dst] < low[vertex]:
+                        low[vertex] = index[dst]
+                if descended:
+                    continue
+
+                # All out-edges are done, returns to the parent.
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[vertex] < low[parent]:
+                        low[parent] = low[vertex]
+
+                # vertex is the root of a component, pops the component off
+                # of the Tarjan stack.
+                if low[vertex] == index[vertex]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == vertex:
+                            break
+                    components.append(component)
+
+        # Tarjan completes sink components first.
+        components.reverse()
+        return components
+
+
+    def csr_sections(self) -> dict:
+        """
+        Returns the graph in compressed sparse row form, as a dictionary of
+        array.array objects (see CSRDirectedGraph): the forward arrays
+        out_offsets/out_targets/out_weights, the reverse arrays
+        in_offsets/in_sources/in_weights, and meta holding v_count. Rows are
+        sorted by neighbour. Weights are stored as 64-bit integers, or as
+        doubles if any weight is not an integer.
+        """
+        rows = [sorted(self._out_edges(src)) for src in range(self.v_count)]
+        weight_type = 'q'
+        for row in rows:
+            for _, weight in row:
+                if not isinstance(weight, int):
+                    weight_type = 'd'
+
+        # Forward CSR, plus in-degree counts for the reverse one.
+        out_offsets = array('q', [0])
+        out_targets = array('i')
+        out_weights = array(weight_type)
+        in_degree = [0] * (self.v_count + 1)
+        for row in rows:
+            for dst, weight in row:
+                out_targets.append(dst)
+                out_weights.append(weight)
+                in_degree[dst + 1] += 1
+            out_offsets.append(len(out_targets))
+
+        # Reverse CSR. Sources are visited in ascending order, so each
+        # reverse row comes out sorted.
+        in_offsets = array('q', [0] * (self.v_count + 1))
+        for vertex in range(self.v_count):
+            in_offsets[vertex + 1] = in_offsets[vertex] + in_degree[vertex + 1]
+        fill = array('q', in_offsets)
+        in_sources = array('i', [0]) * len(out_targets)
+        in_weights = array(weight_type, [0]) * len(out_targets)
+        for src, row in enumerate(rows):
+            for dst, weight in row:
+                in_sources[fill[dst]] = src
+                in_weights[fill[dst]] = weight
+                fill[dst] += 1
+
+        return {
+            'meta': array('q', [self.v_count]),
+            'out_offsets': out_offsets,
+            'out_targets': out_targets,
+            'out_weights': out_weights,
+            'in_offsets': in_offsets,
+            'in_sources': in_sources,
+            'in_weights': in_weights,
+        }
+
+    def save(self, path) -> None:
+        """
+        Writes the graph to the file at "path" in the binary format of
+        graph_io, as CSR arrays in both directions.
+        """
+        graph_io.write_file(path, graph_io.DIRECTED, self.csr_sections())
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Reads a graph written by save() from the file at "path".
+        If mmap is True, returns a read-only CSRDirectedGraph whose arrays
+        are memory-mapped views of the file: opening is O(1) and traversals
+        and dijkstra() read straight from the page cache. Otherwise returns
+        a new, modifiable graph of this class holding the same edges.
+        """
+        kind, sections = graph_io.read_file(path, use_mmap=mmap)
+        if kind != graph_io.DIRECTED:
+            raise ValueError(f"{path} does not hold a directed graph")
+        view = CSRDirectedGraph(sections)
+        if mmap:
+            return view
+
+        graph = cls()
+        graph._append_vertices(view.v_count)
+        graph.v_count = view.v_count
+        graph.add_edges_from(view.get_edges())
+        return graph
+
+    def snapshot(self):
+        """
+        Returns an immutable CSRDirectedGraph holding the current vertices
+        and edges. It is built in O(V + E) once per version of the graph;
+        later calls return the same object until the graph is modified, so
+        one snapshot can be shared by any number of reader threads. Changes
+        made to the graph afterwards never show in a snapshot already taken.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] != self._version:
+            snapshot = (self._version, CSRDirectedGraph(self.csr_sections()))
+            self._snapshot = snapshot
+        return snapshot[1]
+
+    def freeze(self):
+        """
+        Same as snapshot().
+        """
+        return self.snapshot()
+
+    def enable_incremental_cycle_check(self, reject_cycles=True) -> None:
+        """
+        Turns on incremental cycle detection. The graph then maintains a
+        topological order as edges are added (Pearce-Kelly algorithm), so
+        add_edge() only reorders the vertices between the two endpoints and
+        has_cycle() becomes O(1).
+        If reject_cycles is True, add_edge() raises CycleError instead of
+        adding an edge that would close a cycle, and the graph stays acyclic.
+        Otherwise the edge is added and the cycle is reported by has_cycle()
+        and topological_sort().
+        Raises CycleError if reject_cycles is True and the graph already has a
+        cycle.
+        """
+        check = _IncrementalCycleCheck(self, reject_cycles)
+        if reject_cycles and check.cycle is not None:
+            raise CycleError(check.cycle)
+        self._cycle_check = check
+
+    def disable_incremental_cycle_check(self) -> None:
+        """
+        Turns off incremental cycle detection.
+        """
+        self._cycle_check = None
 
+    def track_shortest_paths(self, src: int) -> ShortestPathTree:
+        """
+        Takes in an integer "src" representing a vertex and returns a
+        ShortestPathTree for it that the graph keeps up to date: every
+        add_edge(), remove_edge() and add_vertex() call repairs the tree
+        incrementally, so tree.distance(v) and tree.path(v) are always
+        current without re-running dijkstra(). add_edges_from() rebuilds it.
+        Calling this again for the same source returns the same tree.
+        Raises ValueError if src is not a vertex of the graph.
+        """
+        if src < 0 or src > self.v_count - 1:
+            raise ValueError(f"source {src} is not in the graph")
+        if self._trees is None:
+            self._trees = dict()
+        tree = self._trees.get(src)
+        if tree is None:
+            tree = self._trees[src] = ShortestPathTree(self, src)
+        return tree
+
+    def untrack_shortest_paths(self, src: int) -> None:
+        """
+        Stops maintaining the shortest path tree of "src", if there is one.
+        """
+        if self._trees is not None:
+            self._trees.pop(src, None)
+
+    def build_landmark_index(self, k=8, seed=0) -> LandmarkIndex:
+        """
+        Returns a LandmarkIndex of up to "k" landmarks for point-to-point
+        queries on this graph; see LandmarkIndex.
+        """
+        return LandmarkIndex(self, k, seed)
+
+    def build_reachability_index(self, max_bytes=1 << 26) -> ReachabilityIndex:
+        """
+        Returns a ReachabilityIndex answering reachable(u, v) queries on
+        this graph in O(1) (closure) or near O(1) (2-hop labels, used when
+        the closure would exceed "max_bytes"); see ReachabilityIndex.
+        """
+        return ReachabilityIndex(self, max_bytes)
+
+    def enable_path_cache(self, max_entries=128, max_bytes=None) -> None:
+        """
+        Turns on memoization of dijkstra() results. Results are keyed by
+        source vertex and graph version, so any add_vertex(), add_edge() or
+        remove_edge() call makes every cached result unreachable.
+        User can input optional parameters max_entries and max_bytes to bound
+        the cache; least recently used results are evicted first.
+        Calling this again replaces the cache (and resets its statistics).
+        """
+        self._path_cache = ShortestPathCache(max_entries, max_bytes)
+
+    def disable_path_cache(self) -> None:
+        """
+        Turns off memoization of dijkstra() results and drops the cache.
+        """
+        self._path_cache = None
+
+    def path_cache_stats(self) -> dict:
+        """
+        Returns the statistics of the path cache as a dictionary (see
+        ShortestPathCache.stats()), or None if the cache is not enabled.
+        """
+        if self._path_cache is None:
+            return None
+        return self._path_cache.stats()
 
-    def dijkstra(self, src: int) -> []:
+    def enable_instrumentation(self, sink=None):
+        """
+        Turns on instrumentation of dijkstra(), shortest_path() and the
+        dfs()/bfs() traversals. Each call then reports an
+        instrumentation.CallRecord with its wall time and work counters to
+        "sink", any callable taking the record (for example
+        instrumentation.LoggingSink()). Dijkstra results served from the path
+        cache run no search and are not reported.
+        If no sink is given, a new instrumentation.HistogramSink is used.
+        Returns the sink.
+        """
+        if sink is None:
+            sink = instrumentation.HistogramSink()
+        self._instrumentation = sink
+        return sink
+
+    def disable_instrumentation(self) -> None:
+        """
+        Turns off instrumentation. Searches then run without any counting.
+        """
+        self._instrumentation = None
+
+    def dijkstra(self, src: int, targets=None, return_predecessors=False):
         """
         Takes in an integer "src" representing the starting vertex, and
         returns a list with one value per each vertex in the graph, where
@@ -347,47 +2018,545 @@ class DirectedGraph:
         src to vertex 0, vertex 1, etc...
         If a vertex is not reached from src, the return value is INFINITY.
         Note that src is assumed to be a valid index.
+        User can input optional parameter targets, an iterable of vertices.
+        The search may then stop as soon as every valid target has been
+        settled. The targets always get their exact distance; vertices the
+        search did not settle are left at INFINITY.
+        If return_predecessors is True, returns a (distances, predecessors)
+        tuple instead, where predecessors[v] is the vertex before v on a
+        shortest path from src, or None for src and unreached vertices. Pass
+        it to reconstruct_path() to rebuild the actual path.
+        If the path cache is enabled (see enable_path_cache()), full results
+        are memoized per source until the graph is next modified.
+        """
+        cache = self._path_cache
+        if cache is None:
+            distances, predecessors = self._dijkstra_search(src, targets)
+        else:
+            # Any cached result for src answers both full and targeted
+            # queries. Copies are returned so callers cannot alter the cache.
+            entry = cache.get(src, self._version)
+            if entry is None:
+                entry = self._dijkstra_search(src, None)
+                cache.put(src, self._version, entry)
+            distances, predecessors = list(entry[0]), list(entry[1])
+
+        if return_predecessors:
+            return distances, predecessors
+        return distances
+
+    def _dijkstra_search(self, src: int, targets, reverse=False) -> tuple:
         """
-        # Dictionary to store visited vertices. Stored in the key/value form
-        # vertex/distance
-        visited = dict()
+        Runs the search behind dijkstra() and returns the (distances,
+        predecessors) tuple. If reverse is True, the search follows edges
+        backwards, giving the distances from every vertex to "src" (and
+        successors instead of predecessors).
+        """
+        # Distance and predecessor per vertex. distances holds the best
+        # distance found so far; it is final once the vertex is settled.
+        distances = [float('inf')] * self.v_count
+        predecessors = [None] * self.v_count
+        settled = [False] * self.v_count
+        distances[src] = 0
+
+        # Targets still waiting to be settled, if the caller asked for an
+        # early exit.
+        remaining = None
+        if targets is not None:
+            remaining = set()
+            for target in targets:
+                if 0 <= target < self.v_count:
+                    remaining.add(target)
+
+        # Creates minheap priority queue ordered by distance. Push tuple
+        # (distance, src) onto queue where distance = 0.
+        to_visit = [(0, src)]
+
+        # Heap and edge functions, swapped for counting wrappers when
+        # instrumentation is enabled so the loop itself is unchanged.
+        heappush, heappop = heapq.heappush, heapq.heappop
+        out_edges = self._in_edges if reverse else self._out_edges
+        probe = None
+        if self._instrumentation is not None:
+            probe = instrumentation.Probe('dijkstra', self._instrumentation)
+            heappush, heappop = probe.counting_push(heappush), probe.counting_pop(heappop)
+            out_edges = probe.counting_edges(out_edges)
+
+        # While queue is not empty, pop the closest vertex off of queue.
+        while to_visit:
+            distance, vertex = heappop(to_visit)
 
-        # Creates minheap priority queue. Push tuple (src,distance) onto queue
-        # where distance = 0.
-        to_visit = []
-        heapq.heappush(to_visit,(src,0))
+            # A vertex can be pushed several times as shorter distances are
+            # found. Only the first pop is current; later ones are stale
+            # entries and are skipped (lazy deletion).
+            if settled[vertex]:
+                continue
+            settled[vertex] = True
+
+            # Stop once every target has been settled.
+            if remaining is not None:
+                remaining.discard(vertex)
+                if not remaining:
+                    break
+
+            # Relax each outgoing edge, pushing the neighbour only when a
+            # strictly shorter distance to it has been found.
+            for dst, weight in out_edges(vertex):
+                new_distance = distance + weight
+                if new_distance < distances[dst]:
+                    distances[dst] = new_distance
+                    predecessors[dst] = vertex
+                    heappush(to_visit, (new_distance, dst))
+
+        if probe is not None:
+            probe.finish(settled.count(True))
+
+        # After an early exit, unsettled vertices only hold tentative
+        # distances. Reset them so every returned value is exact.
+        if remaining is not None:
+            for vertex in range(self.v_count):
+                if not settled[vertex]:
+                    distances[vertex] = float('inf')
+                    predecessors[vertex] = None
+
+        return distances, predecessors
+
+    def delta_stepping(self, src: int, delta=None) -> []:
+        """
+        Takes in an integer "src" representing the starting vertex and
+        returns the same list of shortest path lengths as dijkstra(), using
+        a DeltaStepping engine with bucket width "delta" (see DeltaStepping
+        for the default). The engine is kept until the graph changes or
+        another delta is asked for, so repeated searches skip splitting the
+        edges.
+        Raises ValueError if src is not a vertex of the graph or delta is
+        not positive.
+        """
+        engine = self._delta_engine
+        if engine is None or engine.is_stale() or engine.requested_delta != delta:
+            engine = self._delta_engine = DeltaStepping(self, delta)
+        return engine.distances(src)
 
-        # While queue is not empty, pop vertex and distance pair off of queue.
-        while to_visit:
-            curr = heapq.heappop(to_visit)
-            vertex = curr[0]
-            distance = curr[1]
-
-            # If vertex has not yet been visited, or if a shorter distance
-            # from src to vertex has been found, replace distance value in
-            # dictionary with new shorter distance.
-            if vertex not in visited or visited[vertex] > distance:
-                visited[vertex] = distance
-                # For each adjacent vertex, push the adjacent vertex and the
-                # distance from src to adjacent vertex onto queue.
-                for col in range(self.v_count):
-                    di = self.adj_matrix[vertex][col]
-                    if 0 < di:
-                        heapq.heappush(to_visit, (col, di + distance))
-
-        # Initializes a return list representing all vertices in the graph and fill
-        # with infinity. Traverse visited dictionary and fill return list with the
-        # shortest distance from src to each vertex. Each index in return list will represent a
-        # vertex, and the value at the index will represent the shortest path from src
-        # to the index.
-        return_list = [float('inf')] * self.v_count
-        for vertex in visited:
-            return_list[vertex] = visited[vertex]
-        return return_list
+    def dijkstra_many(self, sources, workers=None, batch_size=64):
+        """
+        Takes in an iterable of source vertices and yields a tuple (src,
+        distances) for each of them, where distances is the list dijkstra()
+        returns for src. Results are yielded as they complete, which is not
+        necessarily the order of "sources".
+        The graph is packed once into a shared memory block in the CSR
+        layout of csr_sections(), and a pool of "workers" processes
+        (default: one per CPU) attaches to it, so no worker receives a copy
+        of the graph. Sources are sent in batches of "batch_size", and at
+        most two batches per worker are in flight so results are consumed
+        as they stream in. If workers is 0, the searches run one by one in
+        this process instead.
+        Raises ValueError if a source is not a vertex of the graph.
+        The graph must not be modified while the generator is in use.
+        """
+        sources = list(sources)
+        for src in sources:
+            if src < 0 or src > self.v_count - 1:
+                raise ValueError(f"source {src} is not in the graph")
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 0:
+            for src in sources:
+                yield src, self.dijkstra(src)
+            return
+
+        # Lays the CSR arrays out in shared memory in the graph_io format.
+        sections = self.csr_sections()
+        block = shared_memory.SharedMemory(create=True, size=graph_io.packed_size(sections))
+        try:
+            graph_io.pack_sections(graph_io.DIRECTED, sections, block.buf)
+            del sections
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared_graph,
+                                     initargs=(block.name,)) as pool:
+                batches = (sources[i:i + batch_size] for i in range(0, len(sources), batch_size))
+                pending = set()
+                try:
+                    for batch in batches:
+                        pending.add(pool.submit(_dijkstra_batch, batch))
+                        if len(pending) >= 2 * workers:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                yield from future.result()
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield from future.result()
+                finally:
+                    # Drops queued batches if the caller stopped early.
+                    for future in pending:
+                        future.cancel()
+        finally:
+            block.close()
+            block.unlink()
+
+    @staticmethod
+    def reconstruct_path(predecessors: [], src: int, dst: int) -> []:
+        """
+        Takes in a predecessor list returned by dijkstra() for the starting
+        vertex "src" and returns the list of vertices on the shortest path
+        from "src" to "dst", both included. Returns an empty list if "dst"
+        was not reached.
+        """
+        if dst == src:
+            return [src]
+        if predecessors[dst] is None:
+            return []
+
+        # Walks the predecessor links back from dst to src, then reverses.
+        path = [dst]
+        while path[-1] != src:
+            path.append(predecessors[path[-1]])
+        path.reverse()
+        return path
+
+    def shortest_path(self, src: int, dst: int, heuristic=None):
+        """
+        Takes in two integers "src" and "dst" and returns a tuple
+        (distance, path), where path is the list of vertices on a shortest
+        path from "src" to "dst". If "dst" cannot be reached, or either
+        vertex does not exist, returns (INFINITY, []).
+        Runs a bidirectional Dijkstra search, forward from src over out-edges
+        and backward from dst over in-edges, and stops once the two searches
+        meet, so only the region around the two endpoints is explored.
+        User can input optional parameter heuristic, a callable where
+        heuristic(u, v) is a lower bound on the distance from u to v. The
+        bound must be consistent (heuristic(u, v) <= weight(u, w) +
+        heuristic(w, v) for every edge, and likewise in the reverse
+        direction). Both searches are then guided towards each other as a
+        bidirectional A* search.
+        """
+        inf = float('inf')
 
+        # Either vertex does not exist, no path.
+        if src < 0 or src > self.v_count - 1 or dst < 0 or dst > self.v_count - 1:
+            return inf, []
+        if src == dst:
+            return 0, [src]
+
+        # Potential of each vertex, cached as the heuristic may be costly.
+        # Averaging the forward estimate (to dst) and the backward estimate
+        # (from src) gives one potential that keeps the reduced edge weights
+        # non-negative for both searches. Without a heuristic it is 0 and the
+        # search is plain bidirectional Dijkstra.
+        potentials = dict()
+
+        def potential(vertex):
+            if heuristic is None:
+                return 0
+            if vertex not in potentials:
+                potentials[vertex] = (heuristic(vertex, dst) - heuristic(src, vertex)) / 2
+            return potentials[vertex]
+
+        # Per-direction distance, predecessor and settled tables. Dictionaries
+        # keep the cost proportional to the explored region instead of V.
+        dist_f, dist_r = {src: 0}, {dst: 0}
+        pred_f, pred_r = {src: None}, {dst: None}
+        settled_f, settled_r = set(), set()
+
+        # Forward heap is keyed by distance + potential, backward heap by
+        # distance - potential.
+        heap_f = [(potential(src), src)]
+        heap_r = [(-potential(dst), dst)]
+
+        # Heap and edge functions, swapped for counting wrappers when
+        # instrumentation is enabled so the loop itself is unchanged.
+        heappush, heappop = heapq.heappush, heapq.heappop
+        out_edges, in_edges = self._out_edges, self._in_edges
+        probe = None
+        if self._instrumentation is not None:
+            probe = instrumentation.Probe('shortest_path', self._instrumentation, pushes=2)
+            heappush, heappop = probe.counting_push(heappush), probe.counting_pop(heappop)
+            out_edges, in_edges = probe.counting_edges(out_edges), probe.counting_edges(in_edges)
+
+        # Length of the best src -> dst path found so far, and the vertex
+        # where its two halves meet.
+        best = inf
+        meet = None
+
+        while heap_f and heap_r:
+            # No path through unsettled vertices can beat the best one found.
+            if heap_f[0][0] + heap_r[0][0] >= best:
+                break
+
+            # Expands the direction with the smaller frontier.
+            if len(heap_f) <= len(heap_r):
+                _, vertex = heappop(heap_f)
+                if vertex in settled_f:
+                    continue
+                settled_f.add(vertex)
+                for nxt, weight in out_edges(vertex):
+                    new_distance = dist_f[vertex] + weight
+                    if new_distance < dist_f.get(nxt, inf):
+                        dist_f[nxt] = new_distance
+                        pred_f[nxt] = vertex
+                        heappush(heap_f, (new_distance + potential(nxt), nxt))
+                    # Edge joins the two searches, record a candidate path.
+                    if nxt in dist_r and new_distance + dist_r[nxt] < best:
+                        best = new_distance + dist_r[nxt]
+                        meet = nxt
+            else:
+                _, vertex = heappop(heap_r)
+                if vertex in settled_r:
+                    continue
+                settled_r.add(vertex)
+                for prev, weight in in_edges(vertex):
+                    new_distance = dist_r[vertex] + weight
+                    if new_distance < dist_r.get(prev, inf):
+                        dist_r[prev] = new_distance
+                        pred_r[prev] = vertex
+                        heappush(heap_r, (new_distance - potential(prev), prev))
+                    if prev in dist_f and new_distance + dist_f[prev] < best:
+                        best = new_distance + dist_f[prev]
+                        meet = prev
+
+        if probe is not None:
+            probe.finish(len(settled_f) + len(settled_r))
+
+        if meet is None:
+            return inf, []
+
+        # Joins the forward half (src -> meet) and backward half (meet -> dst).
+        path = []
+        vertex = meet
+        while vertex is not None:
+            path.append(vertex)
+            vertex = pred_f[vertex]
+        path.reverse()
+        vertex = pred_r[meet]
+        while vertex is not None:
+            path.append(vertex)
+            vertex = pred_r[vertex]
+        return best, path
+
+
+class SparseDirectedGraph(DirectedGraph):
+    """
+    Directed weighted graph with the same behaviour as DirectedGraph, but
+    stored as one dictionary of out-edges per vertex instead of a dense
+    adjacency matrix.
+    - memory is O(V + E) instead of O(V^2)
+    - add_vertex is O(1) and edge updates are O(1)
+    - neighbour iteration is O(degree) instead of O(V), in both directions
+    Use DirectedGraph for small or dense graphs and this class for large,
+    sparse ones.
+    """
+
+    def __init__(self, start_edges=None):
+        """
+        Store graph info as a list of out-edge dictionaries, where
+        adj_list[src][dst] is the weight of the edge from src to dst, plus
+        the mirrored in-edge dictionaries in_list[dst][src].
+        """
+        self.v_count = 0
+        self.adj_list = []
+        self.in_list = []
+
+        # populate graph with initial vertices and edges (if provided)
+        if start_edges is not None:
+            v_count = 0
+            for u, v, _ in start_edges:
+                v_count = max(v_count, u, v)
+            for _ in range(v_count + 1):
+                self.add_vertex()
+            for u, v, weight in start_edges:
+                self.add_edge(u, v, weight)
+
+    def __str__(self):
+        """
+        Return content of the graph in human-readable form, using the same
+        matrix layout as DirectedGraph.
+        """
+        if self.v_count == 0:
+            return 'EMPTY GRAPH\n'
+        out = '   |'
+        out += ' '.join(['{:2}'.format(i) for i in range(self.v_count)]) + '\n'
+        out += '-' * (self.v_count * 3 + 3) + '\n'
+        for i in range(self.v_count):
+            row = self.adj_list[i]
+            out += '{:2} |'.format(i)
+            out += ' '.join(['{:2}'.format(row.get(j, 0)) for j in range(self.v_count)]) + '\n'
+        out = f"GRAPH ({self.v_count} vertices):\n{out}"
+        return out
+
+    # ------------------------------------------------------------------ #
+
+    def _append_vertices(self, count: int) -> None:
+        """
+        Storage primitive. Adds "count" edgeless vertices, numbered from
+        v_count on, to the storage in O(count).
+        """
+        # Each new vertex starts with empty out-edge and in-edge
+        # dictionaries. No other vertex needs to change.
+        for _ in range(count):
+            self.adj_list.append(dict())
+            self.in_list.append(dict())
+
+    def _set_weight(self, src: int, dst: int, weight: int) -> None:
+        """
+        Storage primitive. Stores or (when weight is 0) deletes the edge
+        from "src" to "dst".
+        """
+        if weight == 0:
+            self.adj_list[src].pop(dst, None)
+            self.in_list[dst].pop(src, None)
+        else:
+            self.adj_list[src][dst] = weight
+            self.in_list[dst][src] = weight
+
+    def _weight(self, src: int, dst: int) -> int:
+        """
+        Storage primitive. Returns the weight of the edge from "src" to
+        "dst", or 0 if there is no such edge.
+        """
+        return self.adj_list[src].get(dst, 0)
+
+    def _out_edges(self, src: int):
+        """
+        Storage primitive. Returns the (destination vertex, weight) pairs
+        for each edge leaving "src", in insertion order.
+        """
+        return self.adj_list[src].items()
+
+    def _in_edges(self, dst: int):
+        """
+        Storage primitive. Returns the (source vertex, weight) pairs for
+        each edge entering "dst", in insertion order.
+        """
+        return self.in_list[dst].items()
+
+
+
+class CSRDirectedGraph(DirectedGraph):
+    """
+    Read-only directed weighted graph stored in compressed sparse row (CSR)
+    form, in both directions
+    - out_offsets[v]:out_offsets[v + 1] is the slice of out_targets and
+      out_weights holding the edges leaving v, sorted by destination
+    - in_offsets, in_sources and in_weights mirror it for entering edges
+    The arrays can be any int sequences, including memoryviews over a
+    memory-mapped file, so a graph opened with DirectedGraph.load() reads its
+    edges straight from the page cache. Methods that modify the graph raise
+    TypeError.
+    """
+
+    def __init__(self, sections):
+        """
+        Takes in a dictionary of CSR arrays as produced by
+        DirectedGraph.csr_sections().
+        """
+        self.sections = sections
+        self.v_count = sections['meta'][0]
+        self.out_offsets = sections['out_offsets']
+        self.out_targets = sections['out_targets']
+        self.out_weights = sections['out_weights']
+        self.in_offsets = sections['in_offsets']
+        self.in_sources = sections['in_sources']
+        self.in_weights = sections['in_weights']
+
+    def __str__(self):
+        """
+        Return content of the graph in human-readable form, using the same
+        matrix layout as DirectedGraph.
+        """
+        if self.v_count == 0:
+            return 'EMPTY GRAPH\n'
+        out = '   |'
+        out += ' '.join(['{:2}'.format(i) for i in range(self.v_count)]) + '\n'
+        out += '-' * (self.v_count * 3 + 3) + '\n'
+        for i in range(self.v_count):
+            out += '{:2} |'.format(i)
+            out += ' '.join(['{:2}'.format(self._weight(i, j)) for j in range(self.v_count)]) + '\n'
+        out = f"GRAPH ({self.v_count} vertices):\n{out}"
+        return out
+
+    # ------------------------------------------------------------------ #
+
+    def _read_only(self, *args, **kwargs):
+        """
+        Replaces every modifying method.
+        """
+        raise TypeError("CSRDirectedGraph is read-only")
+
+    add_vertex = add_edge = remove_edge = add_edges_from = _read_only
+    _append_vertices = _set_weight = _read_only
+
+    def _weight(self, src: int, dst: int) -> int:
+        """
+        Storage primitive. Returns the weight of the edge from "src" to
+        "dst", or 0 if there is no such edge, by binary search of the
+        sorted row.
+        """
+        start, end = self.out_offsets[src], self.out_offsets[src + 1]
+        index = bisect_left(self.out_targets, dst, start, end)
+        if index < end and self.out_targets[index] == dst:
+            return self.out_weights[index]
+        return 0
+
+    def _out_edges(self, src: int):
+        """
+        Storage primitive. Returns the (destination vertex, weight) pairs
+        for each edge leaving "src", in ascending order of destination.
+        """
+        start, end = self.out_offsets[src], self.out_offsets[src + 1]
+        return zip(self.out_targets[start:end], self.out_weights[start:end])
+
+    def _in_edges(self, dst: int):
+        """
+        Storage primitive. Returns the (source vertex, weight) pairs for
+        each edge entering "dst", in ascending order of source.
+        """
+        start, end = self.in_offsets[dst], self.in_offsets[dst + 1]
+        return zip(self.in_sources[start:end], self.in_weights[start:end])
+
+    def _sorted_out_neighbours(self, src: int):
+        """
+        Returns the destinations of the edges leaving "src". Rows are
+        already sorted, so this is a slice of out_targets.
+        """
+        return self.out_targets[self.out_offsets[src]:self.out_offsets[src + 1]]
+
+    def snapshot(self):
+        """
+        Returns the graph itself, which is already immutable.
+        """
+        return self
+
+
+# ---------------------------------------------------------------------- #
+# Worker side of DirectedGraph.dijkstra_many(). Each pool process attaches
+# to the shared memory block once and keeps a read-only graph over it.
+
+_shared_block = None
+_shared_graph = None
+
+
+def _attach_shared_graph(name: str) -> None:
+    """
+    Pool initializer. Opens the shared memory block called "name" and wraps
+    its CSR arrays in a CSRDirectedGraph without copying them.
+    """
+    global _shared_block, _shared_graph
+    _shared_block = shared_memory.SharedMemory(name=name)
+    _shared_graph = CSRDirectedGraph(graph_io.unpack_sections(_shared_block.buf)[1])
+
+
+def _dijkstra_batch(sources: []) -> []:
+    """
+    Runs dijkstra() on the shared graph from each vertex in "sources" and
+    returns the list of (src, distances) tuples.
+    """
+    return [(src, _shared_graph.dijkstra(src)) for src in sources]
 
 
 if __name__ == '__main__':
+    import random
+    import tempfile
 
     print("\nPDF - method add_vertex() / add_edge example 1")
     print("----------------------------------------------")
@@ -460,3 +2629,139 @@ if __name__ == '__main__':
     print('\n', g)
     for i in range(5):
         print(f'DIJKSTRA {i} {g.dijkstra(i)}')
+
+
+    print("\nShortestPathTree - incremental updates against dijkstra()")
+    print("---------------------------------------------------------")
+    # add_edges_from() growing the graph while the cycle check is on.
+    g = DirectedGraph([(0, 1, 1)])
+    g.enable_incremental_cycle_check()
+    tree = g.track_shortest_paths(0)
+    g.add_edges_from([(1, 2, 1)])
+    print(tree.distances, tree.path(2))
+
+    # Random insertions, weight changes, removals and new vertices; the
+    # tracked trees must match a fresh dijkstra() after every step.
+    rng = random.Random(0)
+    for cls in (DirectedGraph, SparseDirectedGraph):
+        g = cls([(src, dst, rng.randint(1, 20)) for src in range(30) for dst in range(30)
+                 if src != dst and rng.random() < 0.1])
+        trees = [g.track_shortest_paths(src) for src in (0, 7, 19)]
+        mismatches = 0
+        for step in range(1000):
+            action = rng.random()
+            src, dst = rng.randrange(g.v_count), rng.randrange(g.v_count)
+            if action < 0.02:
+                g.add_vertex()
+            elif action < 0.6:
+                g.add_edge(src, dst, rng.randint(1, 20))
+            else:
+                g.remove_edge(src, dst)
+            for tree in trees:
+                if tree.distances != g.dijkstra(tree.source):
+                    mismatches += 1
+        print(f'{cls.__name__}: 1000 random updates, {mismatches} mismatches')
+
+
+    print("\nIncremental cycle check - against has_cycle() from scratch")
+    print("----------------------------------------------------------")
+    rng = random.Random(1)
+    for reject_cycles in (True, False):
+        g, plain = SparseDirectedGraph(), SparseDirectedGraph()
+        for _ in range(40):
+            g.add_vertex()
+            plain.add_vertex()
+        g.enable_incremental_cycle_check(reject_cycles)
+        mismatches = rejected = 0
+        for step in range(1500):
+            src, dst = rng.randrange(40), rng.randrange(40)
+            if rng.random() < 0.2:
+                g.remove_edge(src, dst)
+                plain.remove_edge(src, dst)
+            else:
+                plain.add_edge(src, dst)
+                try:
+                    g.add_edge(src, dst)
+                except CycleError as error:
+                    # Must be a real cycle through the new edge, and the
+                    # edge must really close one.
+                    rejected += 1
+                    if not (plain.has_cycle() and plain.is_valid_path(error.cycle)):
+                        mismatches += 1
+                    plain.remove_edge(src, dst)
+            order, cycle = g.topological_sort()
+            if g.has_cycle() != plain.has_cycle():
+                mismatches += 1
+            elif order is not None:
+                position = {vertex: number for number, vertex in enumerate(order)}
+                if any(position[src] > position[dst] for src, dst, _ in g.get_edges()):
+                    mismatches += 1
+            elif not g.is_valid_path(cycle):
+                mismatches += 1
+        print(f'reject_cycles={reject_cycles}: 1500 random updates, {rejected} rejected, {mismatches} mismatches')
+
+
+    print("\nLandmarkIndex - guided queries against dijkstra()")
+    print("-------------------------------------------------")
+    rng = random.Random(2)
+    g = SparseDirectedGraph([(src, dst, rng.randint(1, 20)) for src in range(300) for dst in range(300)
+                             if src != dst and rng.random() < 0.01])
+    index = g.build_landmark_index(k=4)
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(os.path.join(directory, 'landmarks'))
+        loaded = LandmarkIndex.load(os.path.join(directory, 'landmarks'), g)
+        mismatches = 0
+        for _ in range(300):
+            src, dst = rng.randrange(g.v_count), rng.randrange(g.v_count)
+            expected = g.dijkstra(src)[dst]
+            for each in (index, loaded):
+                distance, path = each.shortest_path(src, dst)
+                if distance != expected or each.lower_bound(src, dst) > expected:
+                    mismatches += 1
+                elif path and sum(g._weight(u, v) for u, v in zip(path, path[1:])) != distance:
+                    mismatches += 1
+        del loaded
+    print(f'300 random queries, {mismatches} mismatches')
+    g.add_edge(0, 1, 1)
+    print('stale after add_edge():', index.is_stale(), index.shortest_path(0, 1) == g.shortest_path(0, 1))
+
+
+    print("\nReachabilityIndex - closure and 2-hop labels against dfs()")
+    print("----------------------------------------------------------")
+    rng = random.Random(3)
+    g = SparseDirectedGraph([(src, dst, 1) for src in range(200) for dst in range(200)
+                             if src != dst and rng.random() < 0.006])
+    reached = [set(g.dfs(src)) for src in range(g.v_count)]
+    pairs = [(rng.randrange(-1, g.v_count + 1), rng.randrange(-1, g.v_count + 1)) for _ in range(5000)]
+    expected = [0 <= u < g.v_count and 0 <= v < g.v_count and v in reached[u] for u, v in pairs]
+    for max_bytes in (1 << 26, 0):
+        index = g.build_reachability_index(max_bytes)
+        answers = index.reachable_many(pairs)
+        single = [index.reachable(u, v) for u, v in pairs]
+        print(f"{index.kind}: {index.stats()['components']} components, "
+              f"{sum(answers)} of 5000 pairs reachable, matches dfs(): {answers == single == expected}")
+    g.add_edge(0, 199)
+    print('stale after add_edge():', index.is_stale(), index.reachable(0, 199))
+
+
+    print("\nDeltaStepping - bucket searches against dijkstra()")
+    print("--------------------------------------------------")
+    rng = random.Random(4)
+    for cls in (DirectedGraph, SparseDirectedGraph):
+        g = cls([(src, dst, rng.randint(1, 20)) for src in range(150) for dst in range(150)
+                 if src != dst and rng.random() < 0.03])
+        mismatches = 0
+        for delta in (None, 1, 2.5, 7, 50):
+            for src in range(0, 150, 10):
+                if g.delta_stepping(src, delta) != g.dijkstra(src):
+                    mismatches += 1
+        # The engine must notice changes to the graph.
+        g.add_edge(0, 149, 1)
+        g.remove_edge(*g.get_edges()[5][:2])
+        if g.delta_stepping(0) != g.dijkstra(0):
+            mismatches += 1
+        print(f'{cls.__name__}: 5 deltas x 15 sources, {mismatches} mismatches')
+    try:
+        g.delta_stepping(0, 0)
+    except ValueError as error:
+        print('delta=0:', error)
@@ -0,0 +1,197 @@
+# Description: Thread-safe access to DirectedGraph and UndirectedGraph. ReadWriteLock lets any number of reader
+# threads share a graph while writers get it alone, and ConcurrentGraph wraps a graph so that every method call
+# takes the right side of the lock. For traversals that run long or stream results, snapshot() hands out an
+# immutable CSR copy of the graph (see DirectedGraph.snapshot()) that readers can use without any locking while
+# writers keep modifying the live graph.
+
+import inspect
+import threading
+from contextlib import contextmanager
+
+# Methods that modify a graph (or its search settings) and so need the
+# write side of the lock. Every other method is a read.
+MUTATORS = frozenset({
+    'add_vertex', 'add_edge', 'remove_edge', 'remove_vertex', 'add_edges_from',
+    'enable_incremental_cycle_check', 'disable_incremental_cycle_check',
+    'track_shortest_paths', 'untrack_shortest_paths',
+    'enable_path_cache', 'disable_path_cache',
+    'enable_instrumentation', 'disable_instrumentation',
+})
+
+
+class ReadWriteLock:
+    """
+    Lock with a shared (read) side and an exclusive (write) side
+    - any number of threads can hold the read side at once
+    - the write side excludes readers and other writers
+    - a waiting writer stops new readers from entering, so a steady stream
+      of readers cannot starve writers
+    The lock is not reentrant: a thread holding either side must not
+    acquire it again.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        with self.condition:
+            while self.writer or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+
+    def release_read(self) -> None:
+        with self.condition:
+            self.readers -= 1
+            if self.readers == 0:
+                self.condition.notify_all()
+
+    def acquire_write(self) -> None:
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+
+    def release_write(self) -> None:
+        with self.condition:
+            self.writer = False
+            self.condition.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        """
+        Context manager holding the read side.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        """
+        Context manager holding the write side.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentGraph:
+    """
+    Wrapper making one graph safe to share between threads
+    - methods listed in MUTATORS run under the write side of a
+      ReadWriteLock, all other methods under the read side, so readers run
+      in parallel with each other and never see half-applied changes
+    - iter_* traversals and other generator methods (dijkstra_many())
+      run on snapshot(), so a generator kept open by a reader never holds
+      the lock or sees later changes
+    - read() and write() give direct access to the graph for several calls
+      made as one step
+    Attributes other than methods (v_count, adj_list, ...) are read without
+    locking.
+    """
+
+    def __init__(self, graph):
+        """
+        Takes in the graph to wrap. The graph must not be used directly
+        afterwards.
+        """
+        self.graph = graph
+        self.lock = ReadWriteLock()
+
+    def __getattr__(self, name):
+        # Only called for names not found on the wrapper itself.
+        value = getattr(self.graph, name)
+        if not callable(value):
+            return value
+        # A generator method only starts working once iterated, long after
+        # a lock taken around the call would be released, so it runs on a
+        # snapshot instead, like the iter_* traversals.
+        if name.startswith('iter_') or inspect.isgeneratorfunction(value):
+            def call(*args, **kwargs):
+                return getattr(self.snapshot(), name)(*args, **kwargs)
+        elif name in MUTATORS:
+            def call(*args, **kwargs):
+                with self.lock.write_locked():
+                    return getattr(self.graph, name)(*args, **kwargs)
+        else:
+            def call(*args, **kwargs):
+                with self.lock.read_locked():
+                    return getattr(self.graph, name)(*args, **kwargs)
+        call.__name__ = name
+        call.__doc__ = value.__doc__
+        return call
+
+    def __str__(self):
+        with self.lock.read_locked():
+            return str(self.graph)
+
+    @contextmanager
+    def read(self):
+        """
+        Context manager yielding the graph under the read side of the lock.
+        Only reading methods may be called on it.
+        """
+        with self.lock.read_locked():
+            yield self.graph
+
+    @contextmanager
+    def write(self):
+        """
+        Context manager yielding the graph under the write side of the lock,
+        for a group of changes that readers must see all at once or not at
+        all.
+        """
+        with self.lock.write_locked():
+            yield self.graph
+
+    def snapshot(self):
+        """
+        Returns an immutable snapshot of the graph as it is now (see
+        DirectedGraph.snapshot()). Snapshots are cached per graph version, so
+        between writes every caller shares the same one.
+        """
+        with self.lock.read_locked():
+            return self.graph.snapshot()
+
+    def freeze(self):
+        """
+        Same as snapshot().
+        """
+        return self.snapshot()
+
+
+if __name__ == '__main__':
+    import random
+
+    from d_graph import SparseDirectedGraph
+
+    print("\nConcurrentGraph - dijkstra_many() while the graph changes")
+    print("---------------------------------------------------------")
+    rng = random.Random(0)
+    edges = [(src, dst, rng.randint(1, 20)) for src in range(200) for dst in range(200)
+             if src != dst and rng.random() < 0.02]
+    expected = SparseDirectedGraph(edges)
+    for workers in (0, 1):
+        graph = ConcurrentGraph(SparseDirectedGraph(edges))
+        results = graph.dijkstra_many(range(200), workers=workers, batch_size=16)
+        first_half = [next(results) for _ in range(100)]
+
+        # Writers must not wait for the open generator, and its remaining
+        # results must still describe the graph as it was when it started.
+        graph.add_vertex()
+        for src in range(200):
+            graph.add_edge(src, 200, 1)
+            graph.add_edge(200, src, 1)
+        rest = list(results)
+        mismatches = sum(distances != expected.dijkstra(src) for src, distances in first_half + rest)
+        print(f'workers={workers}: {len(first_half + rest)} results, readers holding the lock: '
+              f'{graph.lock.readers}, {mismatches} mismatches, live graph now has {graph.v_count} vertices')
@@ -0,0 +1,349 @@
+# Description: Binary graph file format shared by DirectedGraph and UndirectedGraph. A file is a small header
+# followed by named, 8-byte aligned arrays of little-endian numbers (CSR offsets, neighbour ids, weights, ...).
+# Files are opened with mmap so the arrays are read straight from the page cache, and processes that open the
+# same file share one physical copy. Also provides a streaming reader for large text edge lists.
+
+import csv
+import mmap as _mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Header: magic, format version, graph kind, number of sections.
+MAGIC = b'GRAPHCSR'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sIII4x')
+
+# One table entry per section: name, array typecode, byte offset, item count.
+_ENTRY = struct.Struct('<16sc7xQQ')
+
+# Graph kinds stored in the header. LANDMARKS files hold a landmark index
+# of a directed graph rather than a graph.
+DIRECTED = 0
+UNDIRECTED = 1
+LANDMARKS = 2
+
+_NATIVE_LITTLE = sys.byteorder == 'little'
+
+
+def _align(offset: int) -> int:
+    """
+    Rounds "offset" up to the next multiple of 8.
+    """
+    return (offset + 7) & ~7
+
+
+def packed_size(sections: dict) -> int:
+    """
+    Takes in a dictionary of section name to array.array and returns the
+    number of bytes pack_sections() needs for them.
+    """
+    size = _align(_HEADER.size + _ENTRY.size * len(sections))
+    for values in sections.values():
+        size = _align(size + values.itemsize * len(values))
+    return size
+
+
+def pack_sections(kind: int, sections: dict, buffer=None):
+    """
+    Takes in a graph kind and a dictionary of section name to array.array,
+    and lays them out in the binary format. Writes into "buffer" (any
+    writable buffer of at least packed_size(sections) bytes) if given,
+    otherwise into a new bytearray, and returns the buffer.
+    """
+    size = packed_size(sections)
+    if buffer is None:
+        buffer = bytearray(size)
+    view = memoryview(buffer)
+    if len(view) < size:
+        raise ValueError(f"buffer holds {len(view)} bytes, {size} needed")
+
+    _HEADER.pack_into(view, 0, MAGIC, FORMAT_VERSION, kind, len(sections))
+    entry_offset = _HEADER.size
+    data_offset = _align(_HEADER.size + _ENTRY.size * len(sections))
+    for name, values in sections.items():
+        _ENTRY.pack_into(view, entry_offset, name.encode('ascii'),
+                         values.typecode.encode('ascii'), data_offset, len(values))
+        entry_offset += _ENTRY.size
+
+        # The format is little-endian; big-endian hosts swap a copy.
+        if not _NATIVE_LITTLE:
+            values = array(values.typecode, values)
+            values.byteswap()
+        data = memoryview(values).cast('B')
+        view[data_offset:data_offset + len(data)] = data
+        data_offset = _align(data_offset + len(data))
+    return buffer
+
+
+def unpack_sections(buffer) -> tuple:
+    """
+    Takes in a buffer holding the binary format and returns a tuple (kind,
+    sections), where sections maps each section name to a read-only
+    memoryview of its items. No data is copied on little-endian hosts; the
+    views keep the buffer alive.
+    """
+    view = memoryview(buffer).toreadonly()
+    magic, version, kind, count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("not a graph file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported graph file version {version}")
+
+    sections = dict()
+    for index in range(count):
+        name, typecode, offset, length = _ENTRY.unpack_from(view, _HEADER.size + _ENTRY.size * index)
+        name = name.rstrip(b'\0').decode('ascii')
+        typecode = typecode.decode('ascii')
+        itemsize = array(typecode).itemsize
+        data = view[offset:offset + length * itemsize]
+        if _NATIVE_LITTLE:
+            sections[name] = data.cast(typecode)
+        else:
+            values = array(typecode, data.tobytes())
+            values.byteswap()
+            sections[name] = memoryview(values).toreadonly()
+    return kind, sections
+
+
+def write_file(path, kind: int, sections: dict) -> None:
+    """
+    Writes the sections to the file at "path" in the binary format.
+    """
+    with open(path, 'wb') as file:
+        file.write(pack_sections(kind, sections))
+
+
+def read_file(path, use_mmap=True) -> tuple:
+    """
+    Reads the file at "path" and returns the (kind, sections) tuple of
+    unpack_sections(). If use_mmap is True the file is memory-mapped
+    read-only instead of read into memory, so pages are loaded on demand and
+    shared between processes.
+    """
+    with open(path, 'rb') as file:
+        if use_mmap:
+            buffer = _mmap.mmap(file.fileno(), 0, access=_mmap.ACCESS_READ)
+        else:
+            buffer = file.read()
+    return unpack_sections(buffer)
+
+
+# ---------------------------------------------------------------------- #
+# Streaming edge-list / CSV reader
+
+# Reasons passed to the on_invalid callback of read_edge_file().
+MALFORMED = 'malformed'
+SELF_LOOP = 'self-loop'
+BAD_WEIGHT = 'non-positive weight'
+
+
+def _parse_chunk(text: str, first_line: int, directed: bool, delimiter, comment) -> tuple:
+    """
+    Parses the complete lines in "text", the first of which is line number
+    "first_line" of the file. Returns a tuple (edges, invalid, rows), where
+    edges holds (u, v, weight) tuples for a directed graph or (u, v) tuples
+    for an undirected one, invalid holds a (line number, line, reason) tuple
+    for each rejected row, and rows counts the non-blank, non-comment lines.
+    """
+    lines = [line.rstrip('\r') for line in text.split('\n')]
+    if delimiter is None:
+        fields_list = (line.split() for line in lines)
+    else:
+        fields_list = csv.reader(lines, delimiter=delimiter)
+
+    edges = []
+    invalid = []
+    rows = 0
+    for line_number, (line, fields) in enumerate(zip(lines, fields_list), first_line):
+        # Skips blank lines and comments.
+        if not fields or (comment and line.lstrip().startswith(comment)):
+            continue
+        rows += 1
+        fields = [field.strip() for field in fields]
+
+        if directed:
+            # u v [weight]: integer vertices, weight defaults to 1.
+            if len(fields) not in (2, 3):
+                invalid.append((line_number, line, MALFORMED))
+                continue
+            try:
+                u, v = int(fields[0]), int(fields[1])
+                weight = 1
+                if len(fields) == 3:
+                    try:
+                        weight = int(fields[2])
+                    except ValueError:
+                        weight = float(fields[2])
+            except ValueError:
+                invalid.append((line_number, line, MALFORMED))
+                continue
+            if u < 0 or v < 0:
+                invalid.append((line_number, line, MALFORMED))
+            elif u == v:
+                invalid.append((line_number, line, SELF_LOOP))
+            elif not weight >= 1:
+                invalid.append((line_number, line, BAD_WEIGHT))
+            else:
+                edges.append((u, v, weight))
+        else:
+            # u v: vertex names as strings.
+            if len(fields) != 2 or not fields[0] or not fields[1]:
+                invalid.append((line_number, line, MALFORMED))
+            elif fields[0] == fields[1]:
+                invalid.append((line_number, line, SELF_LOOP))
+            else:
+                edges.append((fields[0], fields[1]))
+    return edges, invalid, rows
+
+
+def _read_chunks(file, chunk_bytes: int):
+    """
+    Yields (text, first line number, bytes read so far) for consecutive
+    pieces of the binary "file" of about "chunk_bytes" bytes each, always
+    cut after a newline so that no line is split between two pieces.
+    """
+    line_number = 1
+    bytes_read = 0
+    remainder = b''
+    while True:
+        data = file.read(chunk_bytes)
+        if not data:
+            break
+        bytes_read += len(data)
+        data = remainder + data
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            # No newline yet, keeps reading until the line is complete.
+            remainder = data
+            continue
+        remainder = data[cut:]
+        text = data[:cut].decode('utf-8')
+        yield text, line_number, bytes_read
+        line_number += text.count('\n')
+    if remainder:
+        yield remainder.decode('utf-8'), line_number, bytes_read
+
+
+def read_edge_file(path, graph, directed: bool, delimiter=None, comment='#', skip_header=False,
+                   chunk_bytes=1 << 22, workers=0, on_invalid='skip', on_progress=None) -> dict:
+    """
+    Streams the edge list at "path" into "graph" without reading the whole
+    file into memory. The file is read in pieces of about "chunk_bytes"
+    bytes, and the edges of each piece go to graph.add_edges_from() as one
+    batch, so peak memory is bounded by the chunk size (times the number of
+    chunks in flight when parsing in parallel).
+    Rows are "u v weight" (weight optional, default 1) for a directed
+    graph and "u v" for an undirected one, split on whitespace, or on
+    "delimiter" (parsed as CSV) if given. Blank lines and lines starting
+    with "comment" are ignored; skip_header drops the first line.
+    Malformed rows, self-loops and non-positive weights are handled
+    according to on_invalid: 'skip' drops them (as add_edge() would),
+    'raise' raises ValueError at the first one, and a callable is called as
+    on_invalid(line_number, line, reason) for each, with reason one of
+    MALFORMED, SELF_LOOP or BAD_WEIGHT. When raising, edges from earlier
+    chunks have already been added.
+    If workers is above 0, chunks are parsed in a thread pool of that size
+    while the calling thread adds the parsed batches in file order.
+    If given, on_progress is called with the statistics dictionary after
+    every chunk. Returns the final statistics: bytes_read, total_bytes,
+    rows, edges (accepted rows) and one count per invalid reason.
+    """
+    if on_invalid not in ('skip', 'raise') and not callable(on_invalid):
+        raise ValueError("on_invalid must be 'skip', 'raise' or a callable")
+
+    stats = {
+        'bytes_read': 0,
+        'total_bytes': os.path.getsize(path),
+        'rows': 0,
+        'edges': 0,
+        MALFORMED: 0,
+        SELF_LOOP: 0,
+        BAD_WEIGHT: 0,
+    }
+
+    def apply(result, bytes_read):
+        # Adds one parsed chunk to the graph and updates the statistics.
+        edges, invalid, rows = result
+        for line_number, line, reason in invalid:
+            stats[reason] += 1
+            if on_invalid == 'raise':
+                raise ValueError(f"line {line_number}: {reason} row {line!r}")
+            if on_invalid != 'skip':
+                on_invalid(line_number, line, reason)
+        if edges:
+            graph.add_edges_from(edges)
+        stats['rows'] += rows
+        stats['edges'] += len(edges)
+        stats['bytes_read'] = bytes_read
+        if on_progress is not None:
+            on_progress(dict(stats))
+
+    def chunks(file):
+        # Drops the header line, if asked to. A piece without a newline is
+        # all header (a one-line file without a final newline), so skipping
+        # goes on until a newline has actually been consumed.
+        skip = skip_header
+        for text, first_line, bytes_read in _read_chunks(file, chunk_bytes):
+            if skip:
+                cut = text.find('\n')
+                if cut == -1:
+                    text = ''
+                else:
+                    text, first_line, skip = text[cut + 1:], first_line + 1, False
+            yield text, first_line, bytes_read
+
+    with open(path, 'rb') as file:
+        if workers <= 0:
+            for text, first_line, bytes_read in chunks(file):
+                apply(_parse_chunk(text, first_line, directed, delimiter, comment), bytes_read)
+            return stats
+
+        # Keeps at most two chunks per worker in flight to bound memory, and
+        # applies results in submission (file) order.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for text, first_line, bytes_read in chunks(file):
+                pending.append((pool.submit(_parse_chunk, text, first_line, directed, delimiter, comment),
+                                bytes_read))
+                if len(pending) >= 2 * workers:
+                    future, done_bytes = pending.popleft()
+                    apply(future.result(), done_bytes)
+            while pending:
+                future, done_bytes = pending.popleft()
+                apply(future.result(), done_bytes)
+    return stats
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    from d_graph import DirectedGraph
+    from ud_graph import UndirectedGraph
+
+    print("\nread_edge_file() - skip_header")
+    print("------------------------------")
+    # Header lines with and without a final newline, shorter and longer
+    # than the chunk size. Only the rows after the header may be read.
+    cases = [
+        ('src dst', DirectedGraph, []),
+        ('src dst\n', DirectedGraph, []),
+        ('src dst\n0 1 5\n1 2', DirectedGraph, [(0, 1, 5), (1, 2, 1)]),
+        ('a_long_header_column_name ' * 8 + '\nx y\ny z\n', UndirectedGraph, [('x', 'y'), ('y', 'z')]),
+        ('u v', UndirectedGraph, []),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'edges.txt')
+        for text, cls, expected in cases:
+            with open(path, 'w') as file:
+                file.write(text)
+            for chunk_bytes in (4, 1 << 22):
+                graph = cls()
+                stats = read_edge_file(path, graph, directed=cls is DirectedGraph, skip_header=True,
+                                       chunk_bytes=chunk_bytes, on_invalid='raise')
+                edges = sorted(graph.get_edges())
+                print(f'{text[:20]!r:24} chunk {chunk_bytes:>7}: {edges} rows={stats["rows"]}',
+                      'OK' if edges == expected else 'MISMATCH')
@@ -0,0 +1,352 @@
+# Description: asyncio query service for DirectedGraph and UndirectedGraph. Answers distance, reachability and
+# shortest path lookups without blocking the event loop: searches run in an executor, identical in-flight requests
+# (same source vertex) share one search, requests for different sources that arrive together are computed as one
+# batch, and a limit on pending requests makes callers wait instead of piling up work.
+#
+# The service can be used directly from coroutines, over a JSON-lines socket (serve()), or through a QueryClient
+# on a local socket pair (open_local_client()), which needs no network.
+
+import asyncio
+import itertools
+import json
+import socket
+
+from d_graph import DirectedGraph
+
+
+class GraphQueryService:
+    """
+    Serves lookups on one graph from an asyncio event loop
+    - each lookup needs the single-source result of its source vertex:
+      dijkstra() distances and predecessors for a DirectedGraph, or hop
+      counts from multi_source_bfs() for an undirected graph
+    - lookups whose source is already being searched wait for that search
+      instead of starting another (coalescing)
+    - new sources are collected for "batch_window" seconds (or until
+      "max_batch" of them) and searched in one executor call (batching);
+      undirected batches share one multi-source BFS pass
+    - at most "max_pending" lookups are admitted at once; the rest wait
+      for a slot (backpressure)
+    The graph must not be modified while the service is in use.
+    """
+
+    def __init__(self, graph, executor=None, max_pending=1024, max_batch=64, batch_window=0.0):
+        """
+        Takes in the graph to serve and an optional concurrent.futures
+        executor for the searches (default: the event loop's default thread
+        pool).
+        """
+        if max_pending < 1 or max_batch < 1:
+            raise ValueError("max_pending and max_batch must be at least 1")
+        self.graph = graph
+        self.directed = isinstance(graph, DirectedGraph)
+        self.executor = executor
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+
+        # Source vertex -> future of its single-source result, for every
+        # search queued or running. batch holds the queued sources.
+        self.in_flight = dict()
+        self.batch = []
+        self.flush_handle = None
+        self.slots = asyncio.Semaphore(max_pending)
+
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.searches = 0
+
+    # ------------------------------------------------------------------ #
+
+    async def distance(self, src, dst):
+        """
+        Returns the length of the shortest path from "src" to "dst" (the
+        number of hops for an undirected graph), or INFINITY if there is
+        none or either vertex does not exist.
+        """
+        result = await self._result(src)
+        if result is None:
+            return float('inf')
+        if self.directed:
+            distances = result[0]
+            return distances[dst] if 0 <= dst < len(distances) else float('inf')
+        return result.get(dst, float('inf'))
+
+    async def reachable(self, src, dst) -> bool:
+        """
+        Returns True if there is a path from "src" to "dst", and False
+        otherwise or if either vertex does not exist.
+        """
+        return await self.distance(src, dst) != float('inf')
+
+    async def shortest_path(self, src, dst):
+        """
+        Returns a tuple (distance, path) for a DirectedGraph, as
+        DirectedGraph.shortest_path() does, but computed from the shared
+        single-source search of "src".
+        Raises TypeError for an undirected graph, which has no weights.
+        """
+        if not self.directed:
+            raise TypeError("shortest_path() needs a DirectedGraph")
+        result = await self._result(src)
+        if result is None or not 0 <= dst < len(result[0]) or result[0][dst] == float('inf'):
+            return float('inf'), []
+        distances, predecessors = result
+        return distances[dst], DirectedGraph.reconstruct_path(predecessors, src, dst)
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the service as a dictionary: requests,
+        coalesced (requests that joined an in-flight search), batches,
+        searches, and in_flight (searches queued or running now).
+        """
+        return {
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'batches': self.batches,
+            'searches': self.searches,
+            'in_flight': len(self.in_flight),
+        }
+
+    # ------------------------------------------------------------------ #
+
+    async def _result(self, src):
+        """
+        Returns the single-source result of "src", joining the in-flight
+        search for it if there is one and queueing a new one otherwise.
+        """
+        async with self.slots:
+            self.requests += 1
+            future = self.in_flight.get(src)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self.in_flight[src] = future
+                self._enqueue(src)
+            # Shielded so one cancelled caller does not cancel the search
+            # for everyone else waiting on it.
+            return await asyncio.shield(future)
+
+    def _enqueue(self, src) -> None:
+        """
+        Adds "src" to the queued batch, and starts the batch once it is full
+        or schedules it to start after the batch window.
+        """
+        self.batch.append(src)
+        if len(self.batch) >= self.max_batch:
+            self._flush()
+        elif self.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.batch_window > 0:
+                self.flush_handle = loop.call_later(self.batch_window, self._flush)
+            else:
+                # Still batches every request made in this loop iteration.
+                self.flush_handle = loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        """
+        Starts a task searching from every queued source.
+        """
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if not self.batch:
+            return
+        batch, self.batch = self.batch, []
+        self.batches += 1
+        self.searches += len(batch)
+        asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: []) -> None:
+        """
+        Runs the searches of "batch" in the executor and resolves their
+        futures.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self._search, batch)
+        except Exception as error:
+            for src in batch:
+                future = self.in_flight.pop(src)
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for src in batch:
+            future = self.in_flight.pop(src)
+            if not future.done():
+                future.set_result(results[src])
+
+    def _search(self, batch: []) -> dict:
+        """
+        Runs in the executor. Returns a dictionary of source to its
+        single-source result, or None for a source not in the graph.
+        """
+        graph = self.graph
+        if self.directed:
+            results = dict()
+            for src in batch:
+                if isinstance(src, int) and 0 <= src < graph.v_count:
+                    results[src] = graph.dijkstra(src, return_predecessors=True)
+                else:
+                    results[src] = None
+            return results
+        results = dict.fromkeys(batch)
+        results.update(graph.multi_source_bfs(batch))
+        return results
+
+    # ------------------------------------------------------------------ #
+    # JSON-lines protocol. Each request is one line
+    #   {"id": 1, "op": "distance", "src": 0, "dst": 3}
+    # with op one of distance, reachable and shortest_path, and each
+    # response is one line {"id": 1, "result": ...} or {"id": 1, "error":
+    # "..."}. Requests on a connection are served concurrently, so
+    # responses can come back in a different order.
+
+    async def handle_connection(self, reader, writer) -> None:
+        """
+        Serves the JSON-lines protocol on one stream connection until the
+        client closes it.
+        """
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _answer(self, line: bytes, writer) -> None:
+        """
+        Answers one request line and writes the response line.
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            operation = {
+                'distance': self.distance,
+                'reachable': self.reachable,
+                'shortest_path': self.shortest_path,
+            }.get(request.get('op'))
+            if operation is None:
+                raise ValueError(f"unknown op {request.get('op')!r}")
+            response = {'id': request_id, 'result': await operation(request['src'], request['dst'])}
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            response = {'id': request_id, 'error': f'{type(error).__name__}: {error}'}
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+
+async def serve(service: GraphQueryService, path=None, host='127.0.0.1', port=0):
+    """
+    Starts serving "service" over the JSON-lines protocol, on a Unix socket
+    at "path" if given and on a TCP socket at host:port otherwise (port 0
+    picks a free one). Returns the asyncio.Server.
+    """
+    if path is not None:
+        return await asyncio.start_unix_server(service.handle_connection, path)
+    return await asyncio.start_server(service.handle_connection, host, port)
+
+
+class QueryClient:
+    """
+    Client for the JSON-lines protocol over a stream connection. Requests
+    may be sent concurrently; responses are matched to them by id.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.waiting = dict()
+        self.receiver = asyncio.get_running_loop().create_task(self._receive())
+        self.server_task = None
+
+    async def request(self, op: str, src, dst):
+        """
+        Sends one request and returns its result. Raises ValueError with
+        the server's message if the request failed.
+        """
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        self.writer.write(json.dumps({'id': request_id, 'op': op, 'src': src, 'dst': dst}).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def distance(self, src, dst):
+        return await self.request('distance', src, dst)
+
+    async def reachable(self, src, dst) -> bool:
+        return await self.request('reachable', src, dst)
+
+    async def shortest_path(self, src, dst):
+        distance, path = await self.request('shortest_path', src, dst)
+        return distance, path
+
+    async def _receive(self) -> None:
+        """
+        Reads response lines and resolves the matching requests.
+        """
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.waiting.pop(response['id'], None)
+                if future is None or future.done():
+                    continue
+                if 'error' in response:
+                    future.set_exception(ValueError(response['error']))
+                else:
+                    future.set_result(response['result'])
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection closed"))
+            self.waiting.clear()
+
+    async def close(self) -> None:
+        """
+        Closes the connection, and the local server side if there is one.
+        """
+        self.writer.close()
+        await self.receiver
+        if self.server_task is not None:
+            await self.server_task
+
+
+async def connect(path=None, host='127.0.0.1', port=None) -> QueryClient:
+    """
+    Opens a QueryClient to a server started by serve(), on the Unix socket
+    at "path" if given and at host:port otherwise.
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    return QueryClient(reader, writer)
+
+
+async def open_local_client(service: GraphQueryService) -> QueryClient:
+    """
+    Returns a QueryClient connected to "service" through a local socket
+    pair, without any listening socket or network. Useful in tests.
+    """
+    server_socket, client_socket = socket.socketpair()
+    reader, writer = await asyncio.open_connection(sock=server_socket)
+    server_task = asyncio.get_running_loop().create_task(service.handle_connection(reader, writer))
+    reader, writer = await asyncio.open_connection(sock=client_socket)
+    client = QueryClient(reader, writer)
+    client.server_task = server_task
+    return client
@@ -0,0 +1,205 @@
+# Description: Opt-in instrumentation for the graph searches shared by DirectedGraph and UndirectedGraph. When a
+# graph has a sink enabled, each dijkstra(), shortest_path() and dfs()/bfs() traversal reports one CallRecord with
+# its wall time and work counters (vertices popped, edges relaxed, pushes, stale pops, revisits) to the sink.
+# A sink is any callable taking a CallRecord; LoggingSink and HistogramSink cover the common cases.
+#
+# The searches count by swapping their push, pop and neighbour functions for counting wrappers from a Probe, so
+# with instrumentation disabled the loops run exactly as before and only pay one attribute check per call.
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+
+class CallRecord:
+    """
+    Work done by one instrumented search call
+    - method is the name of the search ('dijkstra', 'bfs', ...)
+    - seconds is the wall time of the call
+    - vertices_popped counts pops from the heap, stack or queue
+    - edges_relaxed counts edges scanned out of popped vertices
+    - heap_pushes counts pushes onto the heap, stack or queue
+    - stale_pops counts pops skipped because the vertex was already done
+    - revisits counts scanned edges that led nowhere new (the neighbour was
+      already visited, or for dijkstra its distance did not improve)
+    """
+    __slots__ = ('method', 'seconds', 'vertices_popped', 'edges_relaxed', 'heap_pushes', 'stale_pops',
+                 'revisits')
+
+    COUNTERS = ('vertices_popped', 'edges_relaxed', 'heap_pushes', 'stale_pops', 'revisits')
+
+    def __init__(self, method, seconds, vertices_popped, edges_relaxed, heap_pushes, stale_pops, revisits):
+        self.method = method
+        self.seconds = seconds
+        self.vertices_popped = vertices_popped
+        self.edges_relaxed = edges_relaxed
+        self.heap_pushes = heap_pushes
+        self.stale_pops = stale_pops
+        self.revisits = revisits
+
+    def __str__(self):
+        counters = ' '.join(f'{name}={getattr(self, name)}' for name in self.COUNTERS)
+        return f'{self.method} {self.seconds * 1000:.3f} ms {counters}'
+
+    def as_dict(self) -> dict:
+        """
+        Returns the record as a dictionary.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Probe:
+    """
+    Counters for one search call in progress. The search replaces its push,
+    pop and neighbour functions with the wrappers returned here, and calls
+    finish() once done to send a CallRecord to the sink.
+    """
+    __slots__ = ('method', 'sink', 'start', 'initial', 'pops', 'pushes', 'edges')
+
+    def __init__(self, method: str, sink, pushes=1):
+        """
+        Starts timing a call of "method" that reports to "sink". "pushes" is
+        the number of entries the search starts with on its heap or stack.
+        """
+        self.method = method
+        self.sink = sink
+        self.initial = pushes
+        self.pops = 0
+        self.pushes = pushes
+        self.edges = 0
+        self.start = time.perf_counter()
+
+    def counting_push(self, push):
+        """
+        Returns "push" wrapped to count its calls as pushes.
+        """
+        def counted(*args):
+            self.pushes += 1
+            return push(*args)
+        return counted
+
+    def counting_pop(self, pop):
+        """
+        Returns "pop" wrapped to count its calls as pops.
+        """
+        def counted(*args):
+            self.pops += 1
+            return pop(*args)
+        return counted
+
+    def counting_edges(self, neighbours):
+        """
+        Returns the neighbour function "neighbours" wrapped to count the
+        edges it returns. Iterators are turned into lists to be counted.
+        """
+        def counted(*args):
+            result = neighbours(*args)
+            if not hasattr(result, '__len__'):
+                result = list(result)
+            self.edges += len(result)
+            return result
+        return counted
+
+    def finish(self, done: int) -> None:
+        """
+        Takes in the number of vertices the search settled or visited, and
+        reports the call to the sink. Every other pop was stale, and every
+        scanned edge that did not lead to a push was a revisit.
+        """
+        seconds = time.perf_counter() - self.start
+        self.sink(CallRecord(self.method, seconds, self.pops, self.edges, self.pushes,
+                             self.pops - done, self.edges - (self.pushes - self.initial)))
+
+
+class LoggingSink:
+    """
+    Sink that writes each CallRecord as one line to a logger.
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        """
+        Takes in an optional logging.Logger (default: the 'graph' logger)
+        and the level to log at.
+        """
+        self.logger = logger if logger is not None else logging.getLogger('graph')
+        self.level = level
+
+    def __call__(self, record: CallRecord) -> None:
+        self.logger.log(self.level, '%s', record)
+
+
+# Upper bounds of the HistogramSink wall time buckets, in seconds: 1, 2 and
+# 5 times each power of ten from 1 microsecond to 10 seconds.
+DEFAULT_BOUNDS = tuple(m * 10.0 ** e for e in range(-6, 2) for m in (1, 2, 5))
+
+
+class HistogramSink:
+    """
+    In-memory sink that aggregates CallRecords per method
+    - number of calls and total wall time
+    - a histogram of wall times over fixed bucket bounds
+    - totals of every work counter
+    Safe to share between graphs and threads.
+    """
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        """
+        Takes in the ascending upper bounds of the time buckets, in seconds.
+        Times above the last bound go to an extra overflow bucket.
+        """
+        self.bounds = tuple(bounds)
+        self.methods = dict()
+        self.lock = threading.Lock()
+
+    def __call__(self, record: CallRecord) -> None:
+        with self.lock:
+            entry = self.methods.get(record.method)
+            if entry is None:
+                entry = {'calls': 0, 'seconds': 0.0, 'buckets': [0] * (len(self.bounds) + 1)}
+                entry.update((name, 0) for name in CallRecord.COUNTERS)
+                self.methods[record.method] = entry
+            entry['calls'] += 1
+            entry['seconds'] += record.seconds
+            entry['buckets'][bisect_left(self.bounds, record.seconds)] += 1
+            for name in CallRecord.COUNTERS:
+                entry[name] += getattr(record, name)
+
+    def percentile(self, method: str, fraction: float) -> float:
+        """
+        Returns the upper bound of the bucket holding the given fraction
+        (0.5 = median) of the calls of "method", an estimate of that
+        percentile of its wall time. Returns INFINITY if it falls in the
+        overflow bucket, and None if the method was never called.
+        """
+        with self.lock:
+            entry = self.methods.get(method)
+            if entry is None:
+                return None
+            wanted = fraction * entry['calls']
+            seen = 0
+            for bound, count in zip(self.bounds, entry['buckets']):
+                seen += count
+                if seen >= wanted:
+                    return bound
+            return float('inf')
+
+    def summary(self) -> dict:
+        """
+        Returns a copy of the aggregates as a dictionary of method name to
+        {'calls', 'seconds', 'mean_seconds', 'buckets', counter totals...}.
+        """
+        with self.lock:
+            result = dict()
+            for method, entry in self.methods.items():
+                entry = dict(entry, buckets=list(entry['buckets']))
+                entry['mean_seconds'] = entry['seconds'] / entry['calls']
+                result[method] = entry
+            return result
+
+    def reset(self) -> None:
+        """
+        Drops every aggregate.
+        """
+        with self.lock:
+            self.methods = dict()
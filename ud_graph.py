@@ -5,7 +5,196 @@
 # provided by the course as well as pseudocode from the course.
 
 import heapq
+import sys
+from array import array
 from collections import deque
+from collections.abc import Mapping, Sequence
+
+import graph_io
+import instrumentation
+
+class DisjointSet:
+    """
+    Disjoint-set (union-find) structure over hashable items
+    - path compression and union by rank
+    - count is the number of disjoint sets
+    """
+
+    def __init__(self):
+        """
+        Creates an empty disjoint set.
+        """
+        self.parent = dict()
+        self.rank = dict()
+        self.count = 0
+
+    def add(self, item) -> None:
+        """
+        Adds "item" as a new singleton set. If it already exists, does
+        nothing.
+        """
+        if item not in self.parent:
+            self.parent[item] = item
+            self.rank[item] = 0
+            self.count += 1
+
+    def find(self, item):
+        """
+        Returns the representative of the set containing "item", compressing
+        the path walked to reach it.
+        """
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+
+        # Points every item on the walked path directly at the root.
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, a, b) -> bool:
+        """
+        Merges the sets containing "a" and "b". Returns True if they were
+        separate sets, and False if they were already the same set.
+        """
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+
+        # Hangs the shallower tree under the deeper one.
+        if self.rank[root_a] < self.rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        if self.rank[root_a] == self.rank[root_b]:
+            self.rank[root_a] += 1
+        self.count -= 1
+        return True
+
+
+class BitsetAdjacency:
+    """
+    Adjacency of an undirected graph as one Python integer per vertex, used
+    as a bitset: bit j of rows[i] is set if vertex i is adjacent to vertex j
+    - a neighbourhood intersection or union is one big-integer AND or OR,
+      done a machine word at a time in C
+    - set sizes are int.bit_count() popcounts
+    Takes about V * V / 8 bytes, so it suits dense graphs and subgraphs.
+    It does not follow later changes to the graph; see
+    UndirectedGraph.bitset_adjacency().
+    """
+
+    def __init__(self, adjacency):
+        """
+        Takes in a mapping of each vertex name to an iterable of its
+        neighbour names, such as UndirectedGraph.adj_list.
+        """
+        self.names = list(adjacency)
+        self.index = {name: number for number, name in enumerate(self.names)}
+        index = self.index
+
+        # Sets the bits of each row in a bytearray first, so building a row
+        # costs O(degree + V / 8) instead of one big-integer OR per edge.
+        size = (len(self.names) + 7) // 8
+        self.rows = []
+        for name in self.names:
+            bits = bytearray(size)
+            for other in adjacency[name]:
+                number = index[other]
+                bits[number >> 3] |= 1 << (number & 7)
+            self.rows.append(int.from_bytes(bits, 'little'))
+        self.degrees = [row.bit_count() for row in self.rows]
+
+    def triangle_count(self) -> int:
+        """
+        Returns the number of triangles (sets of three pairwise adjacent
+        vertices) in the graph.
+        Each triangle i < j < k is counted once, at its edge (i, j), as the
+        popcount of the neighbours of i above j ANDed with the row of j.
+        """
+        rows = self.rows
+        total = 0
+        for number, row in enumerate(rows):
+            # Neighbours of "number" above it, taken in ascending order.
+            rest = row >> (number + 1) << (number + 1)
+            while rest:
+                low = rest & -rest
+                rest ^= low
+                total += (rest & rows[low.bit_length() - 1]).bit_count()
+        return total
+
+    def common_neighbors(self, u, v) -> int:
+        """
+        Takes in two vertex names and returns the number of vertices
+        adjacent to both, or 0 if either vertex does not exist.
+        """
+        index = self.index
+        if u not in index or v not in index:
+            return 0
+        return (self.rows[index[u]] & self.rows[index[v]]).bit_count()
+
+    def jaccard(self, u, v) -> float:
+        """
+        Takes in two vertex names and returns the Jaccard similarity of
+        their neighbourhoods: common neighbours divided by the size of the
+        union of the neighbourhoods. Returns 0.0 if the union is empty or
+        either vertex does not exist.
+        """
+        index = self.index
+        if u not in index or v not in index:
+            return 0.0
+        first, second = index[u], index[v]
+        common = (self.rows[first] & self.rows[second]).bit_count()
+        union = self.degrees[first] + self.degrees[second] - common
+        return common / union if union else 0.0
+
+    def score_pairs(self, pairs, metric='jaccard') -> []:
+        """
+        Takes in an iterable of (u, v) vertex name pairs and returns a list
+        with the score of each pair, where "metric" is 'jaccard' or
+        'common_neighbors'. Pairs with a missing vertex score 0.
+        Scores are computed in one loop with the rows bound locally, without
+        a method call per pair.
+        """
+        if metric not in ('jaccard', 'common_neighbors'):
+            raise ValueError(f"unknown metric {metric!r}")
+        index = self.index
+        rows = self.rows
+        degrees = self.degrees
+        jaccard = metric == 'jaccard'
+        scores = []
+        append = scores.append
+        for u, v in pairs:
+            first, second = index.get(u), index.get(v)
+            if first is None or second is None:
+                append(0.0 if jaccard else 0)
+                continue
+            common = (rows[first] & rows[second]).bit_count()
+            if jaccard:
+                union = degrees[first] + degrees[second] - common
+                append(common / union if union else 0.0)
+            else:
+                append(common)
+        return scores
+
+    def memory(self) -> int:
+        """
+        Returns the approximate size of the bitset rows in bytes.
+        """
+        return sys.getsizeof(self.rows) + sum(sys.getsizeof(row) for row in self.rows)
+
+
+class _Neighbours(dict):
+    """
+    Neighbours of one UndirectedGraph vertex: a dictionary keyed by the
+    neighbour names (values are unused) that prints as a list of them, so
+    the graph prints as it did when neighbours were stored in lists.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return repr(list(self))
+
 
 class UndirectedGraph:
     """
@@ -14,8 +203,36 @@ class UndirectedGraph:
     - loops not allowed
     - no edge weights
     - vertex names are strings
+    Each vertex maps to a dictionary whose keys are its neighbours (values
+    are unused). Dictionaries keep insertion order like a list, but make
+    edge lookups, insertions and removals O(1).
     """
 
+    # Connected components as a DisjointSet, built on first use and kept up
+    # to date by add_vertex() and add_edge(). None while not built or stale.
+    # Declared on the class so __init__ is unchanged.
+    _components = None
+
+    # Per-vertex neighbour tuples in ascending order, used by ordered
+    # traversals. Entries are dropped when the vertex's edges change.
+    _sorted_adj = None
+
+    # Sink receiving an instrumentation.CallRecord per traversal, or None
+    # while instrumentation is disabled.
+    _instrumentation = None
+
+    # Modification counter, bumped by every mutating method, and the
+    # (version, CSRUndirectedGraph) pair last returned by snapshot().
+    _version = 0
+    _snapshot = None
+
+    # (version, set of (u, v) name pairs) pair, the edge index of
+    # validate_paths(). Holds both orientations of every edge.
+    _edge_index = None
+
+    # (version, BitsetAdjacency) pair last returned by bitset_adjacency().
+    _bitsets = None
+
     def __init__(self, start_edges=None):
         """
         Store graph info as adjacency list
@@ -49,7 +266,11 @@ class UndirectedGraph:
         and adds it to the graph. If the vertex already
         exists, does nothing.
         """
-        self.adj_list[v] = []
+        if v not in self.adj_list:
+            self.adj_list[v] = _Neighbours()
+            self._version += 1
+            if self._components is not None:
+                self._components.add(v)
         
     def add_edge(self, u: str, v: str) -> None:
         """
@@ -79,8 +300,72 @@ class UndirectedGraph:
         u_vertex = self.adj_list[u]
         v_vertex = self.adj_list[v]
 
-        u_vertex.append(v)
-        v_vertex.append(u)
+        u_vertex[v] = None
+        v_vertex[u] = None
+        self._version += 1
+
+        # Merges the two components, if they are being tracked.
+        if self._components is not None:
+            self._components.union(u, v)
+        if self._sorted_adj is not None:
+            self._sorted_adj.pop(u, None)
+            self._sorted_adj.pop(v, None)
+
+    @classmethod
+    def from_edge_list(cls, edges):
+        """
+        Takes in an iterable of (u, v) pairs and returns a new graph holding
+        those edges, built with add_edges_from().
+        """
+        graph = cls()
+        graph.add_edges_from(edges)
+        return graph
+
+    @classmethod
+    def from_edge_file(cls, path, **options):
+        """
+        Takes in the path of a text file with one "u v" edge per line and
+        returns a new graph holding those edges.
+        The file is streamed in chunks through add_edges_from(); see
+        graph_io.read_edge_file() for the accepted options.
+        """
+        graph = cls()
+        graph_io.read_edge_file(path, graph, directed=False, **options)
+        return graph
+
+    def add_edges_from(self, edges) -> int:
+        """
+        Takes in an iterable of (u, v) pairs and adds each edge as add_edge()
+        would, creating missing vertices, skipping self-loops and ignoring
+        edges that already exist. Runs in O(V + E) with no per-edge method
+        calls; component tracking and sorted neighbours are rebuilt lazily
+        afterwards instead of being updated edge by edge.
+        Returns the number of new edges added.
+        """
+        adj_list = self.adj_list
+        added = 0
+        for u, v in edges:
+            if u == v:
+                continue
+
+            # Creates either/both vertices if they do not yet exist.
+            u_vertex = adj_list.get(u)
+            if u_vertex is None:
+                u_vertex = adj_list[u] = _Neighbours()
+            v_vertex = adj_list.get(v)
+            if v_vertex is None:
+                v_vertex = adj_list[v] = _Neighbours()
+
+            # The neighbour dictionaries deduplicate repeated edges.
+            if v not in u_vertex:
+                u_vertex[v] = None
+                v_vertex[u] = None
+                added += 1
+
+        self._components = None
+        self._sorted_adj = None
+        self._version += 1
+        return added
 
     def remove_edge(self, v: str, u: str) -> None:
         """
@@ -101,8 +386,16 @@ class UndirectedGraph:
         u_vertex = self.adj_list[u]
         v_vertex = self.adj_list[v]
 
-        u_vertex.remove(v)
-        v_vertex.remove(u)
+        del u_vertex[v]
+        del v_vertex[u]
+        self._version += 1
+
+        # A removal may split a component, which the disjoint set cannot
+        # undo. Drops it so that it is rebuilt on the next query.
+        self._components = None
+        if self._sorted_adj is not None:
+            self._sorted_adj.pop(u, None)
+            self._sorted_adj.pop(v, None)
 
 
     def remove_vertex(self, v: str) -> None:
@@ -120,7 +413,13 @@ class UndirectedGraph:
         removed_vertex = self.adj_list.pop(v)
         for other_vertex in removed_vertex:
             curr_vertex = self.adj_list[other_vertex]
-            curr_vertex.remove(v)
+            del curr_vertex[v]
+        self._version += 1
+        self._components = None
+        if self._sorted_adj is not None:
+            self._sorted_adj.pop(v, None)
+            for other_vertex in removed_vertex:
+                self._sorted_adj.pop(other_vertex, None)
 
 
     def get_vertices(self) -> []:
@@ -147,8 +446,8 @@ class UndirectedGraph:
         """
         # Empty list containing edges.
         return_list = []
-        # List containing vertices already traversed.
-        no_go = []
+        # Set containing vertices already traversed.
+        no_go = set()
 
         # Iterates through dictionary and
         # adds edges to the return list
@@ -157,7 +456,7 @@ class UndirectedGraph:
             for value in curr_list:
                 if value not in no_go:
                     return_list.append((key,value))
-            no_go.append(key)
+            no_go.add(key)
         return return_list
 
     def is_valid_path(self, path: []) -> bool:
@@ -196,6 +495,39 @@ class UndirectedGraph:
         # has been triggered, return True.
         return True
 
+    def validate_paths(self, paths) -> []:
+        """
+        Takes in an iterable of paths (lists of vertex names) and returns a
+        list of booleans, is_valid_path() of each path.
+        Hops are checked against a hashed set of (u, v) name pairs, built
+        once per version of the graph, so a whole path is checked by one
+        C-level issuperset() call instead of a Python loop per hop.
+        """
+        edges = self._edge_pairs()
+        vertices = self.adj_list
+        valid = []
+        for path in paths:
+            if len(path) < 2:
+                valid.append(len(path) == 0 or path[0] in vertices)
+            else:
+                valid.append(edges.issuperset(zip(path, path[1:])))
+        return valid
+
+    def _edge_pairs(self) -> set:
+        """
+        Returns the set of (u, v) name pairs of every edge in both
+        directions, cached until the graph changes.
+        """
+        cached = self._edge_index
+        if cached is None or cached[0] != self._version:
+            edges = set()
+            for u, v in self.get_edges():
+                edges.add((u, v))
+                edges.add((v, u))
+            cached = (self._version, edges)
+            self._edge_index = cached
+        return cached[1]
+
 
 
     def dfs(self, v_start, v_end=None) -> []:
@@ -212,48 +544,7 @@ class UndirectedGraph:
         When multiple vertices are available for traversal during the search,
         vertices will be traversed in ascending lexicographical order.
         """
-
-        # If starting vertex is not in graph, returns empty list.
-        if v_start not in self.adj_list:
-            return []
-
-        # If a non-existent ending vertex is provided, ignores it.
-        if v_end and v_end not in self.adj_list:
-            v_end = None
-
-        # Initializes list for storing visited vertices, and to_visit
-        # stack for storing vertices not yet visited.
-        visited = []
-        to_visit = deque(v_start)
-
-        # While stack is not empty (aka v_end has not been reached, if
-        # it is defined, and there are still vertices to traverse):
-        while to_visit:
-            # Pops current vertex off of top of stack. If it is v_end,
-            # and v_end has been provided by the user as a valid vertex,
-            # returns visited list immediately.
-            curr_vertex = to_visit.pop()
-            if v_end and curr_vertex == v_end:
-                visited.append(curr_vertex)
-                return visited
-            # If current vertex has been previously traversed, immediately
-            # continues on to popping the next vertex off of the stack.
-            if curr_vertex not in visited:
-                visited.append(curr_vertex)
-            else:
-                continue
-            # Stores vertices adjacent to current vertex in a new list, in
-            # reverse alphabetical order.
-            curr_vertex_list = []
-            for value in self.adj_list[curr_vertex]:
-                curr_vertex_list.append(value)
-            curr_vertex_list.sort(reverse = True)
-            # Adds vertices in the sorted vertices list to the top of the stack.
-            # This way, vertices are put onto the stack in descending lexicographical
-            # order such that the lowest value vertex is at the top of the stack.
-            for value in curr_vertex_list:
-                to_visit.append(value)
-        return visited
+        return list(self.iter_dfs(v_start, v_end))
 
     def bfs(self, v_start, v_end=None) -> []:
         """
@@ -269,74 +560,383 @@ class UndirectedGraph:
         When multiple vertices are available for traversal during the search,
         vertices will be traversed in ascending lexicographical order.
         """
+        return list(self.iter_bfs(v_start, v_end))
 
-        # If starting vertex is not in graph, returns empty list.
+    def iter_dfs(self, v_start, v_end=None, ordered=True):
+        """
+        Generator version of dfs(). Yields the vertices visited during a
+        depth-first search one at a time, so the caller can stop early or
+        stream them without the full visit list being built.
+        If ordered is True, vertices are traversed in ascending
+        lexicographical order, as in dfs(). Otherwise neighbours are taken in
+        insertion order, which skips sorting entirely.
+        The graph must not be modified while the generator is in use.
+        """
+        # If starting vertex is not in graph, yields nothing.
         if v_start not in self.adj_list:
-            return []
+            return
 
         # If a non-existent ending vertex is provided, ignores it.
-        if v_end and v_end not in self.adj_list:
+        if v_end is not None and v_end not in self.adj_list:
             v_end = None
 
-        # Initializes list for storing visited vertices, and to_visit
-        # queue for storing vertices not yet visited.
-        visited = []
-        to_visit = deque(v_start)
-
-        # While stack is not empty (aka v_end has not been reached, if
-        # it is defined, and there are still vertices to traverse):
-        while to_visit:
-            # Pops current vertex off of left end of queue. If it is v_end,
-            # and v_end has been provided by the user as a valid vertex,
-            # returns visited list immediately.
-            curr_vertex = to_visit.popleft()
-            if v_end and curr_vertex == v_end:
-                visited.append(curr_vertex)
-                return visited
-            # If current vertex has been previously traversed, immediately
-            # continues on to popping the next vertex off of the stack.
-            if curr_vertex not in visited:
-                visited.append(curr_vertex)
-            else:
-                continue
-            # Stores vertices adjacent to current vertex in a new list, in
-            # reverse alphabetical order.
-            curr_vertex_list = []
-            for value in self.adj_list[curr_vertex]:
-                curr_vertex_list.append(value)
-            curr_vertex_list.sort()
-            # Adds vertices in the sorted vertices list to the right end of the queue.
-            # This way, vertices are put into the queue in ascending lexicographical
-            # order such that the lowest value vertex towards the left of the queue.
-            for value in curr_vertex_list:
-                to_visit.append(value)
-        return visited
+        # Initializes set for storing visited vertices, and to_visit
+        # stack for storing vertices not yet visited.
+        visited = set()
+        to_visit = [v_start]
+
+        # Stack and neighbour functions, swapped for counting wrappers when
+        # instrumentation is enabled so the loop itself is unchanged.
+        pop, push = to_visit.pop, to_visit.append
+        sorted_adj, adj = self._sorted_neighbours, self.adj_list.__getitem__
+        probe = None
+        if self._instrumentation is not None:
+            probe = instrumentation.Probe('dfs', self._instrumentation)
+            pop, push = probe.counting_pop(pop), probe.counting_push(push)
+            sorted_adj, adj = probe.counting_edges(sorted_adj), probe.counting_edges(adj)
+
+        try:
+            # While stack is not empty (aka v_end has not been reached, if
+            # it is defined, and there are still vertices to traverse):
+            while to_visit:
+                # Pops current vertex off of top of stack. If it has been
+                # previously traversed, continues on to the next vertex.
+                curr_vertex = pop()
+                if curr_vertex in visited:
+                    continue
+                visited.add(curr_vertex)
+                yield curr_vertex
+
+                # Stops once v_end has been reached.
+                if curr_vertex == v_end:
+                    return
+
+                # Adds unvisited neighbours to the top of the stack in
+                # descending order, such that the lowest value vertex is at
+                # the top.
+                if ordered:
+                    neighbours = reversed(sorted_adj(curr_vertex))
+                else:
+                    neighbours = adj(curr_vertex)
+                for value in neighbours:
+                    if value not in visited:
+                        push(value)
+        finally:
+            if probe is not None:
+                probe.finish(len(visited))
+
+    def iter_bfs(self, v_start, v_end=None, ordered=True):
+        """
+        Generator version of bfs(). Yields the vertices visited during a
+        breadth-first search one at a time, so the caller can stop early or
+        stream them without the full visit list being built.
+        If ordered is True, vertices are traversed in ascending
+        lexicographical order, as in bfs(). Otherwise neighbours are taken in
+        insertion order, which skips sorting entirely.
+        The graph must not be modified while the generator is in use.
+        """
+        # If starting vertex is not in graph, yields nothing.
+        if v_start not in self.adj_list:
+            return
+
+        # If a non-existent ending vertex is provided, ignores it.
+        if v_end is not None and v_end not in self.adj_list:
+            v_end = None
+
+        # Vertices are marked as discovered when queued, so each vertex
+        # enters the queue once. This visits them in the same order as
+        # marking them when popped would.
+        discovered = {v_start}
+        to_visit = deque([v_start])
+
+        # Queue and neighbour functions, swapped for counting wrappers when
+        # instrumentation is enabled so the loop itself is unchanged.
+        pop, push = to_visit.popleft, to_visit.append
+        sorted_adj, adj = self._sorted_neighbours, self.adj_list.__getitem__
+        probe = None
+        if self._instrumentation is not None:
+            probe = instrumentation.Probe('bfs', self._instrumentation)
+            pop, push = probe.counting_pop(pop), probe.counting_push(push)
+            sorted_adj, adj = probe.counting_edges(sorted_adj), probe.counting_edges(adj)
+
+        try:
+            while to_visit:
+                # Pops current vertex off of left end of queue.
+                curr_vertex = pop()
+                yield curr_vertex
+
+                # Stops once v_end has been reached.
+                if curr_vertex == v_end:
+                    return
+
+                # Adds undiscovered neighbours to the right end of the queue
+                # in ascending order.
+                if ordered:
+                    neighbours = sorted_adj(curr_vertex)
+                else:
+                    neighbours = adj(curr_vertex)
+                for value in neighbours:
+                    if value not in discovered:
+                        discovered.add(value)
+                        push(value)
+        finally:
+            # Every popped vertex is visited; nothing is stale in a BFS.
+            if probe is not None:
+                probe.finish(probe.pops)
+
+    def _sorted_neighbours(self, v: str) -> tuple:
+        """
+        Returns the neighbours of "v" as a tuple in ascending order. Sorted
+        tuples are cached per vertex until an edge of that vertex changes, so
+        repeated ordered traversals do not sort again.
+        """
+        if self._sorted_adj is None:
+            self._sorted_adj = dict()
+        neighbours = self._sorted_adj.get(v)
+        if neighbours is None:
+            neighbours = tuple(sorted(self.adj_list[v]))
+            self._sorted_adj[v] = neighbours
+        return neighbours
+
+
+    def multi_source_bfs(self, sources) -> dict:
+        """
+        Takes in an iterable of vertices and runs a breadth-first search from
+        each of them in a single pass over the graph. Returns a dictionary
+        mapping each source to a dictionary of {vertex: number of hops} for
+        every vertex it reaches, the source itself included at 0.
+        Sources not in the graph are ignored, and repeated sources are run
+        once.
+        Each source owns one bit of an integer bitmask (MS-BFS). Every vertex
+        keeps the mask of sources that have seen it and the mask of sources
+        whose frontier it is on, so one scan of a vertex's neighbours
+        advances all the searches passing through it at once.
+        """
+        # Assigns each distinct source its bit.
+        sources = [v for v in dict.fromkeys(sources) if v in self.adj_list]
+        distances = {v: {v: 0} for v in sources}
+
+        # seen[v] has a bit set for each search that has reached v, and
+        # frontier[v] for each search that reached v in the last level.
+        adj_list = self.adj_list
+        seen = dict.fromkeys(adj_list, 0)
+        frontier = dict()
+        for bit, v in enumerate(sources):
+            seen[v] = frontier[v] = 1 << bit
+        found = [distances[v] for v in sources]
+
+        hops = 0
+        while frontier:
+            hops += 1
+
+            # Spreads each frontier mask to the neighbours, keeping only
+            # the searches that have not seen the neighbour yet.
+            next_frontier = dict()
+            for vertex, mask in frontier.items():
+                for value in adj_list[vertex]:
+                    new = mask & ~seen[value]
+                    if new:
+                        next_frontier[value] = next_frontier.get(value, 0) | new
+
+            # Marks the new vertices as seen and records their distance for
+            # each search (bit) that reached them.
+            for vertex, mask in next_frontier.items():
+                seen[vertex] |= mask
+                while mask:
+                    low = mask & -mask
+                    found[low.bit_length() - 1][vertex] = hops
+                    mask ^= low
+            frontier = next_frontier
+
+        return distances
+
+    def enable_instrumentation(self, sink=None):
+        """
+        Turns on instrumentation of the dfs()/bfs() traversals. Each
+        traversal then reports an instrumentation.CallRecord with its wall
+        time and work counters to "sink", any callable taking the record.
+        For the generator versions the time runs until the generator is
+        exhausted or closed.
+        If no sink is given, a new instrumentation.HistogramSink is used.
+        Returns the sink.
+        """
+        if sink is None:
+            sink = instrumentation.HistogramSink()
+        self._instrumentation = sink
+        return sink
+
+    def disable_instrumentation(self) -> None:
+        """
+        Turns off instrumentation. Traversals then run without any counting.
+        """
+        self._instrumentation = None
+
+    def save(self, path) -> None:
+        """
+        Writes the graph to the file at "path" in the binary format of
+        graph_io. Vertex names must be strings.
+        """
+        graph_io.write_file(path, graph_io.UNDIRECTED,
+                            _undirected_csr_sections(self.adj_list.items()))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Reads a graph written by save() from the file at "path".
+        If mmap is True, returns a read-only CSRUndirectedGraph whose arrays
+        are memory-mapped views of the file, so opening is O(1) and
+        processes share the same pages. Otherwise returns a new, modifiable
+        graph of this class holding the same vertices and edges.
+        """
+        return _load_undirected(cls, path, mmap)
+
+    def snapshot(self):
+        """
+        Returns an immutable CSRUndirectedGraph holding the current vertices
+        and edges. It is built in O(V + E) once per version of the graph;
+        later calls return the same object until the graph is modified, so
+        one snapshot can be shared by any number of reader threads. Changes
+        made to the graph afterwards never show in a snapshot already taken.
+        Vertex names must be strings.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] != self._version:
+            snapshot = (self._version, CSRUndirectedGraph(_undirected_csr_sections(self.adj_list.items())))
+            self._snapshot = snapshot
+        return snapshot[1]
 
+    def freeze(self):
+        """
+        Same as snapshot().
+        """
+        return self.snapshot()
+
+    def bitset_adjacency(self) -> BitsetAdjacency:
+        """
+        Returns the graph as a BitsetAdjacency, one integer bitset of
+        neighbours per vertex, for triangle and neighbourhood similarity
+        queries on dense graphs. Built in O(V * V / 8) time and memory once
+        per version of the graph; later calls return the same object until
+        the graph is modified.
+        """
+        cached = self._bitsets
+        if cached is None or cached[0] != self._version:
+            cached = (self._version, BitsetAdjacency(self.adj_list))
+            self._bitsets = cached
+        return cached[1]
+
+    def triangle_count(self, bitset=False) -> int:
+        """
+        Returns the number of triangles (sets of three pairwise adjacent
+        vertices) in the graph.
+        Each edge is kept only at its endpoint of lower degree, and each
+        triangle is found once by intersecting these shorter neighbour sets,
+        in O(E * sqrt(E)) time and O(E) extra memory. If bitset is True,
+        counts on bitset_adjacency() instead, which is faster on dense
+        graphs.
+        """
+        if bitset:
+            return self.bitset_adjacency().triangle_count()
+        adj_list = self.adj_list
+        rank = {v: number for number, v in enumerate(sorted(adj_list, key=lambda v: len(adj_list[v])))}
+        higher = {v: {w for w in adj_list[v] if rank[w] > rank[v]} for v in adj_list}
+        total = 0
+        for above in higher.values():
+            for w in above:
+                total += len(above & higher[w])
+        return total
+
+    def common_neighbors(self, u: str, v: str, bitset=False) -> int:
+        """
+        Takes in two strings "u" and "v" representing two vertices and
+        returns the number of vertices adjacent to both, or 0 if either
+        vertex does not exist.
+        Intersects the two neighbour dictionaries in O(min(degree u,
+        degree v)), or uses bitset_adjacency() if bitset is True.
+        """
+        if bitset:
+            return self.bitset_adjacency().common_neighbors(u, v)
+        if u not in self.adj_list or v not in self.adj_list:
+            return 0
+        # Key views intersect by scanning the smaller dictionary.
+        return len(self.adj_list[u].keys() & self.adj_list[v].keys())
+
+    def jaccard(self, u: str, v: str, bitset=False) -> float:
+        """
+        Takes in two strings "u" and "v" representing two vertices and
+        returns the Jaccard similarity of their neighbourhoods, or 0.0 if
+        either vertex does not exist or both have no neighbours.
+        Costs the same as common_neighbors().
+        """
+        if bitset:
+            return self.bitset_adjacency().jaccard(u, v)
+        if u not in self.adj_list or v not in self.adj_list:
+            return 0.0
+        common = self.common_neighbors(u, v)
+        union = len(self.adj_list[u]) + len(self.adj_list[v]) - common
+        return common / union if union else 0.0
+
+    def score_pairs(self, pairs, metric='jaccard', bitset=False) -> []:
+        """
+        Takes in an iterable of (u, v) vertex pairs and returns a list with
+        the 'jaccard' or 'common_neighbors' score of each, 0 for pairs with
+        a missing vertex. Uses bitset_adjacency() if bitset is True.
+        """
+        if bitset:
+            return self.bitset_adjacency().score_pairs(pairs, metric)
+        if metric not in ('jaccard', 'common_neighbors'):
+            raise ValueError(f"unknown metric {metric!r}")
+        adj_list = self.adj_list
+        jaccard = metric == 'jaccard'
+        scores = []
+        append = scores.append
+        for u, v in pairs:
+            first, second = adj_list.get(u), adj_list.get(v)
+            if first is None or second is None:
+                append(0.0 if jaccard else 0)
+                continue
+            common = len(first.keys() & second.keys())
+            if jaccard:
+                union = len(first) + len(second) - common
+                append(common / union if union else 0.0)
+            else:
+                append(common)
+        return scores
 
     def count_connected_components(self) -> int:
         """
         Takes no input and returns an integer representing
         the number of connected components in the graph.
+        Near O(1) while only vertices and edges are being added; the first
+        call after a removal rebuilds the components in O(V + E).
         """
-        # If the graph has no vertices, return 0.
-        if not self.adj_list:
-            return 0
+        return self._get_components().count
 
-        # Initializes list containing all vertices in the
-        # graph. Begins BFS. For each search conducted, increments
-        # the number of components by 1 (components initializes at 0).
-        # Removes the vertices traverses via BFS from the list of
-        # all vertices and repeats until the all vertices list is empty.
-        # Returns the number of components.
-        all_vertices = self.get_vertices()
-        num_components = 0
-        while all_vertices != []:
-            return_list = self.dfs(all_vertices[0])
-            num_components += 1
-            for vertex in return_list:
-                if vertex in all_vertices:
-                    all_vertices.remove(vertex)
-        return num_components
+    def same_component(self, u: str, v: str) -> bool:
+        """
+        Takes in two strings "u" and "v" representing two vertices and
+        returns True if they are in the same connected component, and False
+        otherwise or if either vertex does not exist.
+        """
+        if u not in self.adj_list or v not in self.adj_list:
+            return False
+        components = self._get_components()
+        return components.find(u) == components.find(v)
+
+    def _get_components(self):
+        """
+        Returns the DisjointSet tracking the connected components, building
+        it from scratch if it does not exist yet or was made stale by a
+        removal.
+        """
+        if self._components is None:
+            components = DisjointSet()
+            for vertex in self.adj_list:
+                components.add(vertex)
+            for u, v in self.get_edges():
+                components.union(u, v)
+            self._components = components
+        return self._components
 
     def has_cycle(self) -> bool:
         """
@@ -400,7 +1000,852 @@ class UndirectedGraph:
                     to_visit.append(value)
                     to_visit.append(curr_vertex)
         return False
-   
+
+
+# Degree from which _VertexRecord.has() keeps a set of the neighbour ids
+# instead of scanning the array.
+_MEMBERS_MIN_DEGREE = 32
+
+
+class _VertexRecord:
+    """
+    Storage for one vertex of a CompactUndirectedGraph: its name, the
+    integer ids of its neighbours, and for high degree vertices a set of the
+    same ids (None until needed).
+    """
+    __slots__ = ('name', 'neighbours', 'members')
+
+    def __init__(self, name, neighbours=None):
+        self.name = name
+        self.neighbours = array('i') if neighbours is None else neighbours
+        self.members = None
+
+    def has(self, other_id: int) -> bool:
+        """
+        Returns True if "other_id" is a neighbour. Short arrays are scanned;
+        from _MEMBERS_MIN_DEGREE neighbours on, a set of them is built on
+        first use and kept up to date by link() and unlink(), so checks on
+        hub vertices are O(1) instead of O(degree).
+        """
+        members = self.members
+        if members is None:
+            if len(self.neighbours) < _MEMBERS_MIN_DEGREE:
+                return other_id in self.neighbours
+            members = self.members = set(self.neighbours)
+        return other_id in members
+
+    def link(self, other_id: int) -> None:
+        """
+        Adds "other_id" as a neighbour.
+        """
+        self.neighbours.append(other_id)
+        if self.members is not None:
+            self.members.add(other_id)
+
+    def unlink(self, other_id: int) -> None:
+        """
+        Removes the neighbour "other_id".
+        """
+        self.neighbours.remove(other_id)
+        if self.members is not None:
+            self.members.discard(other_id)
+
+
+class CompactUndirectedGraph:
+    """
+    Undirected graph with the same methods as UndirectedGraph, stored in a
+    compact form for large graphs
+    - each vertex name is interned once to a dense integer id
+    - neighbours are kept as typed int arrays of ids in __slots__ records
+    - names are translated back only when results are returned
+    Edge membership is a C-level scan of a short neighbour array, or a
+    set lookup for high degree vertices (see _VertexRecord.has()). Removing
+    an edge still shifts the array, so use UndirectedGraph when edges are
+    removed constantly on very high degree vertices.
+    """
+
+    # Sink receiving an instrumentation.CallRecord per traversal, or None
+    # while instrumentation is disabled.
+    _instrumentation = None
+
+    # Modification counter, last snapshot and edge index, as in
+    # UndirectedGraph.
+    _version = 0
+    _snapshot = None
+    _edge_index = None
+    _bitsets = None
+
+    def __init__(self, start_edges=None):
+        """
+        Store graph info as interned vertex ids and per-vertex id arrays.
+        ids maps each name to its id, records[id] holds the vertex (None for
+        a free id), and free_ids lists ids of removed vertices to reuse.
+        """
+        self.ids = dict()
+        self.records = []
+        self.free_ids = []
+        self.e_count = 0
+        self._components = None
+
+        # populate graph with initial vertices and edges (if provided), in
+        # bulk so that no neighbour array is searched per edge
+        if start_edges is not None:
+            self.add_edges_from(start_edges)
+
+    def __str__(self):
+        """
+        Return content of the graph in human-readable form, using the same
+        layout as UndirectedGraph.
+        """
+        out = [f'{v}: {self._names(self.records[i].neighbours)}' for v, i in self.ids.items()]
+        out = '\n  '.join(out)
+        if len(out) < 70:
+            out = out.replace('\n  ', ', ')
+            return f'GRAPH: {{{out}}}'
+        return f'GRAPH: {{\n  {out}}}'
+
+    def _names(self, vertex_ids) -> []:
+        """
+        Translates an iterable of vertex ids back to a list of names.
+        """
+        records = self.records
+        return [records[i].name for i in vertex_ids]
+
+    # ------------------------------------------------------------------ #
+
+    def add_vertex(self, v: str) -> None:
+        """
+        Takes in a string "v" representing a vertex
+        and adds it to the graph. If the vertex already
+        exists, does nothing.
+        """
+        if v in self.ids:
+            return
+
+        # Reuses the id of a removed vertex if there is one.
+        if self.free_ids:
+            vertex_id = self.free_ids.pop()
+            self.records[vertex_id] = _VertexRecord(v)
+        else:
+            vertex_id = len(self.records)
+            self.records.append(_VertexRecord(v))
+        self.ids[v] = vertex_id
+        self._version += 1
+
+        if self._components is not None:
+            self._components.add(vertex_id)
+
+    def add_edge(self, u: str, v: str) -> None:
+        """
+        Takes in two strings "u" and "v" representing two
+        vertices and creates a edge between them. If either or
+        both of the vertices do not yet exist in the graph, add
+        the vertex/vertices and then create the edge. If an edge
+        already exists in the graph, or if "u" and "v" refer to the
+        same vertex, does nothing.
+        """
+        if u == v:
+            return
+
+        # If either/both vertices do not yet exist, add them
+        self.add_vertex(u)
+        self.add_vertex(v)
+        u_id, v_id = self.ids[u], self.ids[v]
+
+        # If an edge already exists between the two vertices, do nothing.
+        u_record = self.records[u_id]
+        if u_record.has(v_id):
+            return
+
+        u_record.link(v_id)
+        self.records[v_id].link(u_id)
+        self.e_count += 1
+        self._version += 1
+
+        if self._components is not None:
+            self._components.union(u_id, v_id)
+
+    @classmethod
+    def from_edge_list(cls, edges):
+        """
+        Takes in an iterable of (u, v) pairs and returns a new graph holding
+        those edges, built with add_edges_from().
+        """
+        graph = cls()
+        graph.add_edges_from(edges)
+        return graph
+
+    @classmethod
+    def from_edge_file(cls, path, **options):
+        """
+        Takes in the path of a text file with one "u v" edge per line and
+        returns a new graph holding those edges.
+        The file is streamed in chunks through add_edges_from(); see
+        graph_io.read_edge_file() for the accepted options.
+        """
+        graph = cls()
+        graph_io.read_edge_file(path, graph, directed=False, **options)
+        return graph
+
+    def add_edges_from(self, edges) -> int:
+        """
+        Takes in an iterable of (u, v) pairs and adds each edge as add_edge()
+        would, creating missing vertices, skipping self-loops and ignoring
+        edges that already exist. Names are interned in one pass, edges
+        already in the graph are found with _VertexRecord.has() and repeats
+        within the batch with a set of hashed id pairs, so the cost and the
+        extra memory grow with the batch, not with the graph.
+        Returns the number of new edges added.
+        """
+        ids = self.ids
+        records = self.records
+        add_vertex = self.add_vertex
+
+        # Edges of this batch, as (lower id, higher id) pairs, so that they
+        # are not added twice. Edges from before the batch are only looked
+        # up if the graph had any.
+        seen = set()
+        check_existing = self.e_count > 0
+
+        # Interns every name and keeps the first occurrence of each new
+        # edge, in input order. Neighbour arrays are only extended after the
+        # loop, so has() sees the graph as it was before the batch.
+        new_edges = []
+        for u, v in edges:
+            if u == v:
+                continue
+            u_id = ids.get(u)
+            if u_id is None:
+                add_vertex(u)
+                u_id = ids[u]
+            v_id = ids.get(v)
+            if v_id is None:
+                add_vertex(v)
+                v_id = ids[v]
+            key = (u_id, v_id) if u_id < v_id else (v_id, u_id)
+            if key in seen or (check_existing and records[u_id].has(v_id)):
+                continue
+            seen.add(key)
+            new_edges.append((u_id, v_id))
+
+        for u_id, v_id in new_edges:
+            records[u_id].link(v_id)
+            records[v_id].link(u_id)
+        self.e_count += len(new_edges)
+        self._components = None
+        self._version += 1
+        return len(new_edges)
+
+    def remove_edge(self, v: str, u: str) -> None:
+        """
+        Takes in two strings "u" and "v" representing two
+        vertices and removes the edge between them. If either
+        or both vertices do not exist in the graph, or if there
+        is not an edge between them, does nothing.
+        """
+        if v not in self.ids or u not in self.ids:
+            return
+        u_id, v_id = self.ids[u], self.ids[v]
+        u_record = self.records[u_id]
+        if not u_record.has(v_id):
+            return
+
+        u_record.unlink(v_id)
+        self.records[v_id].unlink(u_id)
+        self.e_count -= 1
+        self._version += 1
+
+        # A removal may split a component. Rebuilt on the next query.
+        self._components = None
+
+    def remove_vertex(self, v: str) -> None:
+        """
+        Takes in a string "v" representing a vertex. Removes
+        this vertex and all edges incident to it from the graph.
+        If the vertex does not exist, does nothing.
+        """
+        if v not in self.ids:
+            return
+
+        # Removes the vertex id from the array of each adjacent vertex, then
+        # frees the id for reuse.
+        vertex_id = self.ids.pop(v)
+        neighbours = self.records[vertex_id].neighbours
+        for other_id in neighbours:
+            self.records[other_id].unlink(vertex_id)
+        self.e_count -= len(neighbours)
+        self.records[vertex_id] = None
+        self.free_ids.append(vertex_id)
+        self._version += 1
+        self._components = None
+
+    def get_vertices(self) -> []:
+        """
+        Returns a list containing the vertices in the graph. Note
+        that the list is unordered.
+        """
+        return list(self.ids)
+
+    def get_edges(self) -> []:
+        """
+        Returns a list containing the edges in the graph. Note
+        that the list is unordered. Each edge is returned as
+        a tuple of two incident vertex names. Note that the
+        two vertices in each tuple are also unordered.
+        """
+        # Each edge is stored in both directions. Keeps the copy whose
+        # neighbour has not been listed yet, tracked in a bitmap of ids.
+        return_list = []
+        done = bytearray(len(self.records))
+        records = self.records
+        for name, vertex_id in self.ids.items():
+            for other_id in records[vertex_id].neighbours:
+                if not done[other_id]:
+                    return_list.append((name, records[other_id].name))
+            done[vertex_id] = 1
+        return return_list
+
+    def is_valid_path(self, path: []) -> bool:
+        """
+        Takes in a list "path" containing vertex names.
+        Returns true if the sequence of vertices represents
+        a valid path in the graph, and False otherwise. An
+        empty path is valid.
+        """
+        for key in path:
+            if key not in self.ids:
+                return False
+        ids = self.ids
+        for index in range(len(path) - 1):
+            if not self.records[ids[path[index]]].has(ids[path[index + 1]]):
+                return False
+        return True
+
+    def validate_paths(self, paths) -> []:
+        """
+        Returns a list of booleans, is_valid_path() of each path in "paths",
+        as UndirectedGraph.validate_paths() does.
+        """
+        edges = self._edge_pairs()
+        vertices = self.ids
+        valid = []
+        for path in paths:
+            if len(path) < 2:
+                valid.append(len(path) == 0 or path[0] in vertices)
+            else:
+                valid.append(edges.issuperset(zip(path, path[1:])))
+        return valid
+
+    def _edge_pairs(self) -> set:
+        """
+        Returns the set of (u, v) name pairs of every edge, as
+        UndirectedGraph._edge_pairs() does.
+        """
+        cached = self._edge_index
+        if cached is None or cached[0] != self._version:
+            edges = set()
+            for u, v in self.get_edges():
+                edges.add((u, v))
+                edges.add((v, u))
+            cached = (self._version, edges)
+            self._edge_index = cached
+        return cached[1]
+
+    def dfs(self, v_start, v_end=None) -> []:
+        """
+        Performs a depth-first search (DFS) from v_start and returns the list
+        of vertices visited, as UndirectedGraph.dfs() does.
+        """
+        return list(self.iter_dfs(v_start, v_end))
+
+    def bfs(self, v_start, v_end=None) -> []:
+        """
+        Performs a breadth-first search (BFS) from v_start and returns the
+        list of vertices visited, as UndirectedGraph.bfs() does.
+        """
+        return list(self.iter_bfs(v_start, v_end))
+
+    def _ordered_neighbours(self, vertex_id: int, ordered: bool):
+        """
+        Returns the neighbour ids of "vertex_id", sorted by name if ordered
+        is True.
+        """
+        neighbours = self.records[vertex_id].neighbours
+        if not ordered:
+            return neighbours
+        records = self.records
+        return sorted(neighbours, key=lambda i: records[i].name)
+
+    def iter_dfs(self, v_start, v_end=None, ordered=True):
+        """
+        Generator version of dfs(), see UndirectedGraph.iter_dfs(). The
+        search runs on ids with a bitmap of visited vertices and translates
+        each vertex to its name as it is yielded.
+        """
+        if v_start not in self.ids:
+            return
+        end_id = self.ids.get(v_end, -1)
+
+        visited = bytearray(len(self.records))
+        to_visit = [self.ids[v_start]]
+
+        # Swapped for counting wrappers when instrumentation is enabled.
+        pop, push, ordered_neighbours = to_visit.pop, to_visit.append, self._ordered_neighbours
+        probe = None
+        if self._instrumentation is not None:
+            probe = instrumentation.Probe('dfs', self._instrumentation)
+            pop, push = probe.counting_pop(pop), probe.counting_push(push)
+            ordered_neighbours = probe.counting_edges(ordered_neighbours)
+
+        try:
+            while to_visit:
+                curr_id = pop()
+                if visited[curr_id]:
+                    continue
+                visited[curr_id] = 1
+                yield self.records[curr_id].name
+                if curr_id == end_id:
+                    return
+
+                # Pushes neighbours in descending order so the lowest is on
+                # top.
+                neighbours = ordered_neighbours(curr_id, ordered)
+                for other_id in reversed(neighbours):
+                    if not visited[other_id]:
+                        push(other_id)
+        finally:
+            if probe is not None:
+                probe.finish(visited.count(1))
+
+    def iter_bfs(self, v_start, v_end=None, ordered=True):
+        """
+        Generator version of bfs(), see UndirectedGraph.iter_bfs(). The
+        search runs on ids with a bitmap of discovered vertices and
+        translates each vertex to its name as it is yielded.
+        """
+        if v_start not in self.ids:
+            return
+        end_id = self.ids.get(v_end, -1)
+
+        start_id = self.ids[v_start]
+        discovered = bytearray(len(self.records))
+        discovered[start_id] = 1
+        to_visit = deque([start_id])
+
+        # Swapped for counting wrappers when instrumentation is enabled.
+        pop, push, ordered_neighbours = to_visit.popleft, to_visit.append, self._ordered_neighbours
+        probe = None
+        if self._instrumentation is not None:
+            probe = instrumentation.Probe('bfs', self._instrumentation)
+            pop, push = probe.counting_pop(pop), probe.counting_push(push)
+            ordered_neighbours = probe.counting_edges(ordered_neighbours)
+
+        try:
+            while to_visit:
+                curr_id = pop()
+                yield self.records[curr_id].name
+                if curr_id == end_id:
+                    return
+                for other_id in ordered_neighbours(curr_id, ordered):
+                    if not discovered[other_id]:
+                        discovered[other_id] = 1
+                        push(other_id)
+        finally:
+            if probe is not None:
+                probe.finish(probe.pops)
+
+    def multi_source_bfs(self, sources) -> dict:
+        """
+        Runs a breadth-first search from every vertex in "sources" in a
+        single bit-parallel pass and returns {source: {vertex: hops}}, as
+        UndirectedGraph.multi_source_bfs() does. Masks are kept per id in
+        lists instead of dictionaries.
+        """
+        ids = self.ids
+        source_ids = [ids[v] for v in dict.fromkeys(sources) if v in ids]
+        distances = [{source_id: 0} for source_id in source_ids]
+
+        seen = [0] * len(self.records)
+        frontier = dict()
+        for bit, source_id in enumerate(source_ids):
+            seen[source_id] = frontier[source_id] = 1 << bit
+
+        hops = 0
+        while frontier:
+            hops += 1
+            next_frontier = dict()
+            for vertex_id, mask in frontier.items():
+                for other_id in self.records[vertex_id].neighbours:
+                    new = mask & ~seen[other_id]
+                    if new:
+                        next_frontier[other_id] = next_frontier.get(other_id, 0) | new
+            for vertex_id, mask in next_frontier.items():
+                seen[vertex_id] |= mask
+                while mask:
+                    low = mask & -mask
+                    distances[low.bit_length() - 1][vertex_id] = hops
+                    mask ^= low
+            frontier = next_frontier
+
+        # Translates ids back to names.
+        records = self.records
+        return {records[source_id].name: {records[i].name: hops for i, hops in found.items()}
+                for source_id, found in zip(source_ids, distances)}
+
+    def enable_instrumentation(self, sink=None):
+        """
+        Turns on instrumentation of the traversals, see
+        UndirectedGraph.enable_instrumentation(). Returns the sink.
+        """
+        if sink is None:
+            sink = instrumentation.HistogramSink()
+        self._instrumentation = sink
+        return sink
+
+    def disable_instrumentation(self) -> None:
+        """
+        Turns off instrumentation.
+        """
+        self._instrumentation = None
+
+    def save(self, path) -> None:
+        """
+        Writes the graph to the file at "path" in the binary format of
+        graph_io. Vertex names must be strings.
+        """
+        graph_io.write_file(path, graph_io.UNDIRECTED,
+                            _undirected_csr_sections(
+                                (name, self._names(self.records[vertex_id].neighbours))
+                                for name, vertex_id in self.ids.items()))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Reads a graph written by save() from the file at "path".
+        If mmap is True, returns a read-only CSRUndirectedGraph whose arrays
+        are memory-mapped views of the file, so opening is O(1) and
+        processes share the same pages. Otherwise returns a new, modifiable
+        graph of this class holding the same vertices and edges.
+        """
+        return _load_undirected(cls, path, mmap)
+
+    def snapshot(self):
+        """
+        Returns an immutable CSRUndirectedGraph holding the current vertices
+        and edges, see UndirectedGraph.snapshot().
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] != self._version:
+            sections = _undirected_csr_sections(
+                (name, self._names(self.records[vertex_id].neighbours))
+                for name, vertex_id in self.ids.items())
+            snapshot = (self._version, CSRUndirectedGraph(sections))
+            self._snapshot = snapshot
+        return snapshot[1]
+
+    def freeze(self):
+        """
+        Same as snapshot().
+        """
+        return self.snapshot()
+
+    def bitset_adjacency(self) -> BitsetAdjacency:
+        """
+        Returns the graph as a BitsetAdjacency, cached per version, as
+        UndirectedGraph.bitset_adjacency() does.
+        """
+        cached = self._bitsets
+        if cached is None or cached[0] != self._version:
+            records = self.records
+            adjacency = {name: self._names(records[vertex_id].neighbours) for name, vertex_id in self.ids.items()}
+            cached = (self._version, BitsetAdjacency(adjacency))
+            self._bitsets = cached
+        return cached[1]
+
+    def _common_count(self, u_id: int, v_id: int) -> int:
+        """
+        Returns the number of common neighbours of two vertex ids, scanning
+        the shorter neighbour array and checking each id with has() on the
+        other record, in O(min(degree u, degree v)) for hub vertices.
+        """
+        first, second = self.records[u_id], self.records[v_id]
+        if len(first.neighbours) > len(second.neighbours):
+            first, second = second, first
+        return sum(map(second.has, first.neighbours))
+
+    def triangle_count(self, bitset=False) -> int:
+        """
+        Returns the number of triangles in the graph, as
+        UndirectedGraph.triangle_count() does.
+        """
+        if bitset:
+            return self.bitset_adjacency().triangle_count()
+        records = self.records
+        neighbours = {vertex_id: records[vertex_id].neighbours for vertex_id in self.ids.values()}
+        rank = {vertex_id: number for number, vertex_id in
+                enumerate(sorted(neighbours, key=lambda vertex_id: len(neighbours[vertex_id])))}
+        higher = {vertex_id: {other_id for other_id in row if rank[other_id] > rank[vertex_id]}
+                  for vertex_id, row in neighbours.items()}
+        total = 0
+        for above in higher.values():
+            for other_id in above:
+                total += len(above & higher[other_id])
+        return total
+
+    def common_neighbors(self, u: str, v: str, bitset=False) -> int:
+        """
+        Returns the number of vertices adjacent to both "u" and "v", as
+        UndirectedGraph.common_neighbors() does.
+        """
+        if bitset:
+            return self.bitset_adjacency().common_neighbors(u, v)
+        if u not in self.ids or v not in self.ids:
+            return 0
+        return self._common_count(self.ids[u], self.ids[v])
+
+    def jaccard(self, u: str, v: str, bitset=False) -> float:
+        """
+        Returns the Jaccard similarity of the neighbourhoods of "u" and "v",
+        as UndirectedGraph.jaccard() does.
+        """
+        if bitset:
+            return self.bitset_adjacency().jaccard(u, v)
+        return self.score_pairs([(u, v)])[0]
+
+    def score_pairs(self, pairs, metric='jaccard', bitset=False) -> []:
+        """
+        Returns the 'jaccard' or 'common_neighbors' score of each (u, v)
+        pair, as UndirectedGraph.score_pairs() does.
+        """
+        if bitset:
+            return self.bitset_adjacency().score_pairs(pairs, metric)
+        if metric not in ('jaccard', 'common_neighbors'):
+            raise ValueError(f"unknown metric {metric!r}")
+        ids = self.ids
+        records = self.records
+        common_count = self._common_count
+        jaccard = metric == 'jaccard'
+        scores = []
+        append = scores.append
+        for u, v in pairs:
+            u_id, v_id = ids.get(u), ids.get(v)
+            if u_id is None or v_id is None:
+                append(0.0 if jaccard else 0)
+                continue
+            common = common_count(u_id, v_id)
+            if jaccard:
+                union = len(records[u_id].neighbours) + len(records[v_id].neighbours) - common
+                append(common / union if union else 0.0)
+            else:
+                append(common)
+        return scores
+
+    def count_connected_components(self) -> int:
+        """
+        Takes no input and returns an integer representing
+        the number of connected components in the graph.
+        """
+        return self._get_components().count
+
+    def same_component(self, u: str, v: str) -> bool:
+        """
+        Takes in two strings "u" and "v" representing two vertices and
+        returns True if they are in the same connected component, and False
+        otherwise or if either vertex does not exist.
+        """
+        if u not in self.ids or v not in self.ids:
+            return False
+        components = self._get_components()
+        return components.find(self.ids[u]) == components.find(self.ids[v])
+
+    def _get_components(self):
+        """
+        Returns the DisjointSet of vertex ids tracking the connected
+        components, building it if it does not exist or is stale.
+        """
+        if self._components is None:
+            components = DisjointSet()
+            for vertex_id in self.ids.values():
+                components.add(vertex_id)
+            for vertex_id in self.ids.values():
+                for other_id in self.records[vertex_id].neighbours:
+                    if vertex_id < other_id:
+                        components.union(vertex_id, other_id)
+            self._components = components
+        return self._components
+
+    def has_cycle(self) -> bool:
+        """
+        Takes no input and returns True if the graph contains at least one
+        cycle, and False otherwise.
+        A graph is a forest exactly when it has V - C edges, where C is its
+        number of connected components, so this needs no traversal.
+        """
+        return self.e_count > len(self.ids) - self.count_connected_components()
+
+
+def _undirected_csr_sections(adjacency) -> dict:
+    """
+    Takes in an iterable of (vertex name, iterable of neighbour names) pairs
+    and returns the graph as a dictionary of array.array sections: meta
+    holding the vertex and edge counts, the UTF-8 names blob with its
+    name_offsets, and the CSR offsets/neighbours arrays. Vertex ids are
+    assigned in ascending name order, and each neighbour row is sorted, so a
+    row in id order is also in name order.
+    """
+    adjacency = dict(adjacency)
+    names = sorted(adjacency)
+    for name in names:
+        if not isinstance(name, str):
+            raise TypeError(f"vertex names must be strings to be saved, got {name!r}")
+    ids = {name: index for index, name in enumerate(names)}
+
+    name_offsets = array('q', [0])
+    blob = bytearray()
+    offsets = array('q', [0])
+    neighbours = array('i')
+    for name in names:
+        blob += name.encode('utf-8')
+        name_offsets.append(len(blob))
+        neighbours.extend(sorted(ids[other] for other in adjacency[name]))
+        offsets.append(len(neighbours))
+
+    return {
+        'meta': array('q', [len(names), len(neighbours) // 2]),
+        'name_offsets': name_offsets,
+        'names': array('B', blob),
+        'offsets': offsets,
+        'neighbours': neighbours,
+    }
+
+
+def _load_undirected(cls, path, use_mmap):
+    """
+    Reads an undirected graph written by save() from the file at "path".
+    Returns a read-only CSRUndirectedGraph over the memory-mapped file if
+    use_mmap is True, or a new, modifiable graph of class "cls" otherwise.
+    """
+    kind, sections = graph_io.read_file(path, use_mmap=use_mmap)
+    if kind != graph_io.UNDIRECTED:
+        raise ValueError(f"{path} does not hold an undirected graph")
+    view = CSRUndirectedGraph(sections)
+    if use_mmap:
+        return view
+
+    graph = cls()
+    for name in view.ids:
+        graph.add_vertex(name)
+    graph.add_edges_from(view.get_edges())
+    return graph
+
+
+class _SortedNames(Mapping):
+    """
+    Read-only mapping from vertex name to id over the sorted names blob of
+    a CSRUndirectedGraph. Lookups are binary searches that decode only the
+    names they compare against.
+    """
+
+    def __init__(self, name_offsets, names):
+        self.name_offsets = name_offsets
+        self.names = names
+
+    def name(self, vertex_id: int) -> str:
+        """
+        Returns the name of the vertex with id "vertex_id".
+        """
+        start, end = self.name_offsets[vertex_id], self.name_offsets[vertex_id + 1]
+        return bytes(self.names[start:end]).decode('utf-8')
+
+    def __getitem__(self, name):
+        if not isinstance(name, str):
+            raise KeyError(name)
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.name(middle) < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self.name(low) == name:
+            return low
+        raise KeyError(name)
+
+    def __iter__(self):
+        for vertex_id in range(len(self)):
+            yield self.name(vertex_id)
+
+    def __len__(self):
+        return len(self.name_offsets) - 1
+
+    def items(self):
+        return ((self.name(vertex_id), vertex_id) for vertex_id in range(len(self)))
+
+    def values(self):
+        return range(len(self))
+
+
+class _CSRRecords(Sequence):
+    """
+    Sequence of vertex records over the CSR arrays of a CSRUndirectedGraph,
+    created on access.
+    """
+
+    def __init__(self, names, offsets, neighbours):
+        self.names = names
+        self.offsets = offsets
+        self.neighbours = neighbours
+
+    def __getitem__(self, vertex_id):
+        start, end = self.offsets[vertex_id], self.offsets[vertex_id + 1]
+        return _VertexRecord(self.names.name(vertex_id), self.neighbours[start:end])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class CSRUndirectedGraph(CompactUndirectedGraph):
+    """
+    Read-only undirected graph stored in compressed sparse row (CSR) form,
+    as returned by UndirectedGraph.load()
+    - vertex ids follow ascending name order; names live in one UTF-8 blob
+    - offsets[v]:offsets[v + 1] is the sorted slice of neighbours of v
+    The arrays can be memoryviews over a memory-mapped file, so opening a
+    graph copies nothing and traversals read straight from the page cache.
+    Methods that modify the graph raise TypeError.
+    """
+
+    def __init__(self, sections):
+        """
+        Takes in a dictionary of CSR arrays as produced by save().
+        """
+        self.sections = sections
+        self.ids = _SortedNames(sections['name_offsets'], sections['names'])
+        self.records = _CSRRecords(self.ids, sections['offsets'], sections['neighbours'])
+        self.free_ids = []
+        self.e_count = sections['meta'][1]
+        self._components = None
+
+    def _read_only(self, *args, **kwargs):
+        """
+        Replaces every modifying method.
+        """
+        raise TypeError("CSRUndirectedGraph is read-only")
+
+    add_vertex = add_edge = remove_edge = remove_vertex = add_edges_from = _read_only
+
+    def _ordered_neighbours(self, vertex_id: int, ordered: bool):
+        """
+        Returns the neighbour ids of "vertex_id". Rows are sorted by id,
+        which is name order, so no sorting is needed either way.
+        """
+        return self.records.neighbours[self.records.offsets[vertex_id]:self.records.offsets[vertex_id + 1]]
+
+    def snapshot(self):
+        """
+        Returns the graph itself, which is already immutable.
+        """
+        return self
 
 
 if __name__ == '__main__':